@@ -0,0 +1,388 @@
+##
+# Benchmark suite for poly_arithmetic and finite_field_arithmetic.
+#
+# Usage:
+#   python benchmark.py run [--full] [--ops mul,ld,...] [-o results.json]
+#   python benchmark.py compare old.json new.json [--threshold 0.10]
+#   python benchmark.py scaling [--degree N] [--max-workers N] [-o scaling.json]
+#
+# 'run' sweeps the prime sizes in PRIMES over the degrees in DEGREES (the
+# quick profile by default, --full for the whole 8 .. 10^4 range) and writes
+# the timings as JSON. 'compare' matches two such files case by case and
+# flags every case that got slower than the threshold; it exits with 1 if
+# there is at least one regression, so it can be used in scripts.
+# 'scaling' times shared_multiply.multiply on one pair of big polynomials
+# with 1, 2, ... N worker processes and reports the speedup over 1 worker and
+# the parallel efficiency (speedup / workers).
+##
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+import poly_arithmetic as pa
+import finite_field_arithmetic as ffa
+import modular
+import shared_multiply
+
+# Label -> prime. Labels end up in the JSON keys, so keep them stable.
+PRIMES = {
+    "p2": 2,
+    "p7": 7,
+    "p101": 101,
+    "p31": 2 ** 31 - 1,
+    "p61": 2 ** 61 - 1,
+    "p64": 2 ** 64 - 59,
+    "p127": 2 ** 127 - 1,
+}
+
+QUICK_DEGREES = [8, 32, 128]
+FULL_DEGREES = [8, 32, 128, 512, 2048, 10000]
+
+# Rough budget (in coefficient operations) above which a case is skipped.
+# Schoolbook multiplication and long division are quadratic in the degree,
+# so the big degrees are only run for the cheap operations.
+MAX_WORK = 10 ** 8
+
+SEED = 2090
+
+
+def random_poly(p, n, rng, monic=False):
+    """ Random polynomial of degree exactly n (for n >= 0) in Z/pZ. """
+    coeffs = [rng.randint(0, p - 1) for _ in range(n)]
+    coeffs.append(1 if monic else rng.randint(1, p - 1))
+    return pa.Polynomial(coeffs, p)
+
+
+def random_modulus(p, n, rng):
+    """
+    Random monic modulus of degree n. For the arithmetic operations it does
+    not have to be irreducible, and testing that is far too slow for big n,
+    so irreducibility is only enforced where the operation depends on it.
+    """
+    return random_poly(p, n, rng, monic=True)
+
+
+# --- Cases ---
+# Every case is a function (p, n, rng) -> zero-argument callable that runs
+# the operation once, plus a work estimate used to skip infeasible sizes.
+
+def _case_add(p, n, rng):
+    f, g = random_poly(p, n, rng), random_poly(p, n, rng)
+    return lambda: f + g
+
+def _case_sub(p, n, rng):
+    f, g = random_poly(p, n, rng), random_poly(p, n, rng)
+    return lambda: f - g
+
+def _case_mul(p, n, rng):
+    f, g = random_poly(p, n, rng), random_poly(p, n, rng)
+    return lambda: f * g
+
+def _case_ld(p, n, rng):
+    f, g = random_poly(p, 2 * n, rng), random_poly(p, n, rng)
+    return lambda: pa.polynomial_LD(f, g)
+
+def _case_eea(p, n, rng):
+    f, g = random_poly(p, n, rng), random_poly(p, n - 1, rng)
+    return lambda: pa.poly_extended_euclidean_algorithm(f, g)
+
+def _case_gcd(p, n, rng):
+    f, g = random_poly(p, n, rng), random_poly(p, n - 1, rng)
+    return lambda: pa.poly_gcd(f, g)
+
+def _case_ff_mul(p, n, rng):
+    h = random_modulus(p, n, rng)
+    f, g = random_poly(p, n - 1, rng), random_poly(p, n - 1, rng)
+    return lambda: ffa.finite_field_multiply(f, g, h)
+
+def _case_ff_inv(p, n, rng):
+    h = random_modulus(p, n, rng)
+    f = random_poly(p, n - 1, rng)
+    return lambda: ffa.finite_field_inversion(f, h)
+
+def _case_power_mod(p, n, rng):
+    h = random_modulus(p, n, rng)
+    f = random_poly(p, n - 1, rng)
+    # A fixed 64-bit exponent, so that the timing scales with the degree only
+    e = rng.getrandbits(64) | (1 << 63)
+    return lambda: ffa.power_mod(f, e, h)
+
+def _case_compose_mod(p, n, rng):
+    h = random_modulus(p, n, rng)
+    f, g = random_poly(p, n - 1, rng), random_poly(p, n - 1, rng)
+    return lambda: ffa.compose_mod(f, g, h)
+
+def _case_is_primitive(p, n, rng):
+    h = pa.poly_generate_irreducible(p, n, rng)
+    f = ffa.generate_polynomial_h(h, rng)
+    return lambda: ffa.is_primitive(f, h, p)
+
+def _case_irreducibility(p, n, rng):
+    f = random_modulus(p, n, rng)
+    return lambda: pa.poly_irreducibility_check(f)
+
+def _case_generate_irreducible(p, n, rng):
+    # Fresh, but seeded, stream per repetition
+    seeds = iter(range(SEED, SEED + 10 ** 6))
+    return lambda: pa.poly_generate_irreducible(p, n, random.Random(next(seeds)))
+
+def _case_primitive_generation(p, n, rng):
+    h = pa.poly_generate_irreducible(p, n, rng)
+    seeds = iter(range(SEED, SEED + 10 ** 6))
+    return lambda: ffa.primitive_generation(h, p, random.Random(next(seeds)))
+
+def _case_evaluate_many(p, n, rng):
+    f = random_poly(p, n - 1, rng)
+    points = [rng.randint(0, p - 1) for _ in range(n)]
+    return lambda: pa.evaluate_many(f, points)
+
+def _case_interpolate(p, n, rng):
+    # Distinct points need n <= p
+    points = rng.sample(range(p), n)
+    values = [rng.randint(0, p - 1) for _ in range(n)]
+    return lambda: pa.interpolate(points, values, p)
+
+# Coefficient reduction strategies (see modular.py): n products of two
+# random residues, each reduced mod p. Montgomery needs an odd modulus.
+
+def _products(p, n, rng):
+    return [rng.randint(0, p - 1) * rng.randint(0, p - 1) for _ in range(n)]
+
+def _case_reduce_builtin(p, n, rng):
+    xs = _products(p, n, rng)
+    return lambda: [x % p for x in xs]
+
+def _case_reduce_barrett(p, n, rng):
+    xs = _products(p, n, rng)
+    reduce = modular.get_barrett(p).reduce
+    return lambda: [reduce(x) for x in xs]
+
+def _case_reduce_montgomery(p, n, rng):
+    xs = _products(p, n, rng)
+    redc = modular.get_montgomery(p).redc
+    # Inputs are taken to be in Montgomery form already
+    return lambda: [redc(x) for x in xs]
+
+
+def _trial_division_work(p, n):
+    # prime_factors(p^n - 1) trial-divides up to sqrt(p^n - 1) in the worst case
+    return 2 ** ((n * p.bit_length() + 1) // 2)
+
+def _brute_irreducibility_work(p, n):
+    # Every monic polynomial up to degree n/2 is tried as a divisor
+    return sum(p ** k for k in range(1, n // 2 + 1)) * n * n
+
+# Name -> (case, work estimate (p, n) -> int)
+OPERATIONS = {
+    "add": (_case_add, lambda p, n: n),
+    "sub": (_case_sub, lambda p, n: n),
+    "mul": (_case_mul, lambda p, n: n * n),
+    "polynomial_LD": (_case_ld, lambda p, n: n * n),
+    "eea": (_case_eea, lambda p, n: 4 * n * n),
+    "gcd": (_case_gcd, lambda p, n: 2 * n * n),
+    "finite_field_multiply": (_case_ff_mul, lambda p, n: 2 * n * n),
+    "finite_field_inversion": (_case_ff_inv, lambda p, n: 4 * n * n),
+    "power_mod": (_case_power_mod, lambda p, n: 256 * n * n),
+    "compose_mod": (_case_compose_mod, lambda p, n: 4 * n ** 2.5),
+    "is_primitive": (_case_is_primitive,
+                     lambda p, n: _trial_division_work(p, n)
+                     + _brute_irreducibility_work(p, n)),
+    "poly_irreducibility_check": (_case_irreducibility, _brute_irreducibility_work),
+    "poly_generate_irreducible": (_case_generate_irreducible,
+                                  lambda p, n: n * _brute_irreducibility_work(p, n)),
+    "primitive_generation": (_case_primitive_generation,
+                             lambda p, n: _trial_division_work(p, n)
+                             + n * _brute_irreducibility_work(p, n)),
+    "evaluate_many": (_case_evaluate_many, lambda p, n: n * n),
+    "interpolate": (_case_interpolate,
+                    lambda p, n: 4 * n * n if n <= p else MAX_WORK + 1),
+    "reduce_builtin": (_case_reduce_builtin, lambda p, n: n),
+    "reduce_barrett": (_case_reduce_barrett, lambda p, n: n),
+    "reduce_montgomery": (_case_reduce_montgomery,
+                          lambda p, n: n if p % 2 == 1 else MAX_WORK + 1),
+}
+
+
+def case_key(op, prime_label, degree):
+    """ Key under which a case is stored in the results JSON. """
+    return "%s/%s/%d" % (op, prime_label, degree)
+
+
+def time_case(func, repeat):
+    """ Runs func repeat times and returns the timings in seconds. """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(ops=None, primes=None, degrees=None, repeat=5, max_work=MAX_WORK, log=None):
+    """
+    Runs the sweep and returns the results as a JSON-serializable dict.
+    Cases whose estimated work exceeds max_work are left out.
+    """
+    ops = ops or list(OPERATIONS)
+    primes = primes or list(PRIMES)
+    degrees = degrees or QUICK_DEGREES
+
+    results = {}
+    for op in ops:
+        case, work = OPERATIONS[op]
+        for label in primes:
+            p = PRIMES[label]
+            for n in degrees:
+                if work(p, n) > max_work:
+                    continue
+                # Seed per case so that each case sees the same inputs every run
+                rng = random.Random("%d/%s" % (SEED, case_key(op, label, n)))
+                timings = time_case(case(p, n, rng), repeat)
+                key = case_key(op, label, n)
+                results[key] = {
+                    "op": op,
+                    "p": p,
+                    "degree": n,
+                    "repeat": repeat,
+                    "min": min(timings),
+                    "median": statistics.median(timings),
+                }
+                if log is not None:
+                    log("%-45s %12.6f s" % (key, results[key]["min"]))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": SEED,
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold=0.10):
+    """
+    Compares two result dicts (as written by run) on their common cases.
+    Returns a list of (key, old_min, new_min, ratio), sorted by ratio, of the
+    cases where new is more than threshold slower than old.
+    """
+    regressions = []
+    for key, new_case in new["results"].items():
+        old_case = old["results"].get(key)
+        if old_case is None or old_case["min"] == 0:
+            continue
+        ratio = new_case["min"] / old_case["min"]
+        if ratio > 1 + threshold:
+            regressions.append((key, old_case["min"], new_case["min"], ratio))
+    regressions.sort(key=lambda r: r[3], reverse=True)
+    return regressions
+
+
+def scaling(degree=1 << 17, prime="p61", max_workers=None, repeat=3, log=None):
+    """
+    Scaling report of shared_multiply.multiply for two random polynomials of
+    the given degree: one row per worker count from 1 to max_workers (the
+    CPU count by default). The block size is fixed by max_workers, so every
+    row runs exactly the same block products.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    p = PRIMES[prime]
+    rng = random.Random("%d/scaling/%s/%d" % (SEED, prime, degree))
+    f, g = random_poly(p, degree, rng), random_poly(p, degree, rng)
+    block = shared_multiply.block_size(degree + 1, max_workers)
+
+    rows = []
+    for workers in range(1, max_workers + 1):
+        timings = time_case(lambda: shared_multiply.multiply(f, g, workers, block), repeat)
+        best = min(timings)
+        speedup = rows[0]["min"] / best if rows else 1.0
+        rows.append({
+            "workers": workers,
+            "min": best,
+            "median": statistics.median(timings),
+            "speedup": speedup,
+            "efficiency": speedup / workers,
+        })
+        if log is not None:
+            log("%3d workers %12.6f s  speedup %5.2f  efficiency %4.0f%%"
+                % (workers, best, speedup, 100 * speedup / workers))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "seed": SEED,
+            "prime": prime,
+            "degree": degree,
+            "block": block,
+        },
+        "scaling": rows,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the polynomial and finite field arithmetic.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmark sweep")
+    run_parser.add_argument("--full", action="store_true",
+                            help="sweep all degrees up to 10^4")
+    run_parser.add_argument("--ops", help="comma separated operation names")
+    run_parser.add_argument("--primes", help="comma separated prime labels")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("-o", "--output", default="bench_output.json")
+
+    cmp_parser = sub.add_parser("compare", help="flag regressions between two runs")
+    cmp_parser.add_argument("old")
+    cmp_parser.add_argument("new")
+    cmp_parser.add_argument("--threshold", type=float, default=0.10)
+
+    scaling_parser = sub.add_parser("scaling", help="parallel multiplication speedup per worker count")
+    scaling_parser.add_argument("--degree", type=int, default=1 << 17)
+    scaling_parser.add_argument("--prime", default="p61", help="prime label")
+    scaling_parser.add_argument("--max-workers", type=int)
+    scaling_parser.add_argument("--repeat", type=int, default=3)
+    scaling_parser.add_argument("-o", "--output", help="also write the report as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        data = run(
+            ops=args.ops.split(",") if args.ops else None,
+            primes=args.primes.split(",") if args.primes else None,
+            degrees=FULL_DEGREES if args.full else QUICK_DEGREES,
+            repeat=args.repeat,
+            log=print,
+        )
+        with open(args.output, "w") as out:
+            json.dump(data, out, indent=4)
+        return 0
+
+    if args.command == "scaling":
+        data = scaling(args.degree, args.prime, args.max_workers, args.repeat, log=print)
+        if args.output:
+            with open(args.output, "w") as out:
+                json.dump(data, out, indent=4)
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(old, new, args.threshold)
+    for key, old_t, new_t, ratio in regressions:
+        print("REGRESSION %-45s %.6f -> %.6f s (x%.2f)" % (key, old_t, new_t, ratio))
+    if not regressions:
+        print("No regressions above %.0f%%" % (args.threshold * 100))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+##
+# Isomorphisms between two representations Z_p[X]/(h1) and Z_p[X]/(h2) of the
+# same field GF(p^n) (h1, h2 irreducible of the same degree n).
+#
+# The map is fixed by where it sends X: to a root beta of h1 inside
+# Z_p[X]/(h2). beta is found by splitting h1 over Z_p[X]/(h2) (where it has n
+# distinct roots) with Cantor-Zassenhaus. After that the map is linear over
+# Z/pZ, so it is stored as the n x n matrix whose j-th column is beta^j, and
+# converting an element is one matrix-vector product.
+##
+
+import poly_arithmetic as pa
+import finite_field_arithmetic as ffa
+import linear_algebra as la
+
+
+class FieldIsomorphism:
+    """
+    Isomorphism Z_p[X]/(h_from) -> Z_p[X]/(h_to), sending X to root.
+
+    Attributes:
+        root: the image of X, a root of h_from in Z_p[X]/(h_to)
+        matrix: n x n change-of-basis matrix (column j = root^j)
+        inverse_matrix: its inverse, for converting back
+    """
+    def __init__(self, h_from, h_to, rng=None):
+        if h_from.mod != h_to.mod or h_from.degree() != h_to.degree():
+            raise ValueError("moduli must be over the same Z/pZ and of the same degree")
+        self.h_from = h_from
+        self.h_to = h_to
+        self.p = h_to.mod
+        self.n = h_to.degree()
+
+        self.root = find_root_in_field(h_from, h_to, rng)
+
+        columns = []
+        power = pa.Polynomial.one(self.p)
+        for _ in range(self.n):
+            columns.append(la.coefficient_vector(power, self.n))
+            power = ffa.finite_field_multiply(power, self.root, h_to)
+        self.matrix = [list(row) for row in zip(*columns)]
+        self.inverse_matrix = la.matrix_inverse(self.matrix, self.p)
+
+    def convert(self, f):
+        """ Maps f from Z_p[X]/(h_from) to Z_p[X]/(h_to). """
+        f = ffa.poly_mod_reduction(f, self.h_from)
+        v = la.coefficient_vector(f, self.n)
+        return pa.Polynomial(la.matrix_vector(self.matrix, v, self.p), self.p)
+
+    def convert_back(self, g):
+        """ Maps g from Z_p[X]/(h_to) back to Z_p[X]/(h_from). """
+        g = ffa.poly_mod_reduction(g, self.h_to)
+        v = la.coefficient_vector(g, self.n)
+        return pa.Polynomial(la.matrix_vector(self.inverse_matrix, v, self.p), self.p)
+
+    def convert_many(self, elements):
+        """ Converts a batch of elements of Z_p[X]/(h_from). """
+        return [self.convert(f) for f in elements]
+
+
+# --- Polynomials in Y with coefficients in Z_p[X]/(h) ---
+# Stored as lists of reduced Polynomials (ascending in Y), without trailing
+# zeros; the zero polynomial is the empty list. Sums and differences of
+# reduced elements stay reduced, so only products need finite_field_multiply.
+
+def _trim(a):
+    while a and a[-1].degree() == -1:
+        a.pop()
+    return a
+
+def _yadd(a, b, p):
+    zero = pa.Polynomial.zero(p)
+    length = max(len(a), len(b))
+    a = a + [zero] * (length - len(a))
+    b = b + [zero] * (length - len(b))
+    return _trim([x + y for x, y in zip(a, b)])
+
+def _ymul(a, b, h):
+    if not a or not b:
+        return []
+    result = [pa.Polynomial.zero(h.mod)] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x.degree() == -1:
+            continue
+        for j, y in enumerate(b):
+            result[i + j] = result[i + j] + ffa.finite_field_multiply(x, y, h)
+    return _trim(result)
+
+def _ydivmod(a, b, h):
+    """ Quotient and remainder of a / b (b nonzero). """
+    a = list(a)
+    lead_inv = ffa.finite_field_inversion(b[-1], h)
+    quotient = [pa.Polynomial.zero(h.mod)] * max(len(a) - len(b) + 1, 0)
+    while len(a) >= len(b):
+        c = ffa.finite_field_multiply(a[-1], lead_inv, h)
+        shift = len(a) - len(b)
+        quotient[shift] = c
+        for j, y in enumerate(b):
+            a[shift + j] = a[shift + j] - ffa.finite_field_multiply(c, y, h)
+        _trim(a)
+    return _trim(quotient), a
+
+def _ymod(a, b, h):
+    return _ydivmod(a, b, h)[1]
+
+def _ymonic(a, h):
+    lead_inv = ffa.finite_field_inversion(a[-1], h)
+    return [ffa.finite_field_multiply(c, lead_inv, h) for c in a]
+
+def _ygcd(a, b, h):
+    while b:
+        a, b = b, _ymod(a, b, h)
+    return _ymonic(a, h)
+
+def _ypowmod(base, e, m, h):
+    result = [pa.Polynomial.one(h.mod)]
+    base = _ymod(base, m, h)
+    while e > 0:
+        if e % 2 == 1:
+            result = _ymod(_ymul(result, base, h), m, h)
+        base = _ymod(_ymul(base, base, h), m, h)
+        e //= 2
+    return result
+
+
+def find_root_in_field(f, h, rng=None):
+    """
+    Finds a root of f in Z_p[X]/(h), for f that splits into distinct linear
+    factors there (e.g. f irreducible of degree deg(h)).
+
+    Cantor-Zassenhaus equal-degree splitting: for random a,
+    gcd(f, (Y + a)^((q-1)/2) - 1) for odd q = p^n, or gcd(f, Tr(a*Y)) for
+    q = 2^n (Tr being the trace down to Z/2Z), is a proper factor about half
+    of the time. Only the smaller factor is kept, since one root is enough.
+    """
+    p, n = h.mod, h.degree()
+    q = p ** n
+    rng = pa.resolve_rng(rng)
+    one = pa.Polynomial.one(p)
+    current = _ymonic(_trim([pa.Polynomial([c], p) for c in f.coefficients]), h)
+
+    while len(current) > 2:
+        a = ffa.generate_polynomial_h(h, rng)
+        if p == 2:
+            # Tr(a*Y) = sum of (a*Y)^(2^i) for i < n, mod current
+            term = _ymod(_trim([pa.Polynomial.zero(p), a]), current, h)
+            splitter = term
+            for _ in range(n - 1):
+                term = _ymod(_ymul(term, term, h), current, h)
+                splitter = _yadd(splitter, term, p)
+        else:
+            splitter = _yadd(_ypowmod([a, one], (q - 1) // 2, current, h),
+                             [pa.Polynomial([-1], p)], p)
+        if not splitter:
+            continue
+        d = _ygcd(current, splitter, h)
+        if 1 < len(d) < len(current):
+            other = _ydivmod(current, d, h)[0]
+            current = d if len(d) <= len(other) else other
+
+    # current = Y + c (monic), so the root is -c
+    return pa.Polynomial.zero(p) - current[0]
@@ -1,5 +1,13 @@
 import poly_arithmetic as pa
-import random 
+import instrumentation as instr
+import parallel_search
+import math
+import functools
+
+# Entries kept by the caches below (factorize, _monomial_traces). Bounded,
+# since a long-running solver (solver_daemon.py) may see any number of
+# distinct moduli.
+CACHE_SIZE = 256
 
 def poly_mod_reduction(f, h):
     """
@@ -7,16 +15,39 @@ def poly_mod_reduction(f, h):
         Polynomial h. Uses LD from poly arithmetic.
         Is used for finite field addition, multiplication and subtraction
     """
+    if instr.enabled:
+        instr.count("reductions")
+    if isinstance(f, pa.SparsePolynomial):
+        return _sparse_mod_reduction(f, h)
     r = pa.polynomial_LD(f, h)[1]
     if r is None:
-        return pa.Polynomial([0], f.mod)
+        return pa.Polynomial.zero(f.mod)
     return r
 
+def _sparse_mod_reduction(f, h):
+    """
+        Reduces a sparse f modulo h. Long division costs about deg(f) steps,
+        while summing c * (X^e mod h) over the terms of f costs about
+        log(e) field squarings per term; the cheaper of the two is used.
+    """
+    p = f.mod
+    n = max(h.degree(), 1)
+    if len(f.terms) * f.degree().bit_length() * n < f.degree():
+        x = pa.Polynomial.x(p)
+        acc = [0] * n
+        for e, c in f.terms.items():
+            for i, a in enumerate(power_mod(x, e, h).coefficients):
+                acc[i] += c * a
+        return pa.Polynomial(acc, p)
+    return pa.polynomial_LD(f, h)[1]
+
+@instr.timed
 def finite_field_inversion(f: pa.Polynomial, h: pa.Polynomial):
     """
     Obtain the multiplicative inverse of a given polynomial f in the field Z/pZ/(h)
     This uses the extended Euclidean algorithm to find polynomials a, b such that:
-        a*f + b*h = d = gcd(f, h).
+        a*f + b*h = d = gcd(f, h),
+    tracking only a (see pa.poly_half_extended_euclidean).
     
     Args:
         f: polynomial to invert
@@ -36,8 +67,9 @@ def finite_field_inversion(f: pa.Polynomial, h: pa.Polynomial):
     if all((c % p) == 0 for c in f.coefficients):
         return None
 
-    # Compute gcd(f,h) and a,b s.t a*f + b*h = d = gcd(f, h)
-    a, b, d = pa.poly_extended_euclidean_algorithm(f, h)
+    # Compute gcd(f,h) and a s.t a*f = d = gcd(f, h) (mod h); the cofactor
+    # b of h is never needed, so only a is tracked
+    a, d = pa.poly_half_extended_euclidean(f, h)
 
     # invertible iff d == 1 (mod p)
     if not (len(d.coefficients) == 1 and (d.coefficients[0] % p) == 1):
@@ -46,16 +78,15 @@ def finite_field_inversion(f: pa.Polynomial, h: pa.Polynomial):
     inv = poly_mod_reduction(a, h)
     return inv
 
-def prime_factors(n):
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def factorize(n):
     """
-        Get unique prime factors of n.
-        Trial and error approach
-        Used for primality check
+        Prime factorization of n as a tuple of (prime, exponent) pairs.
+        Trial and error approach, cached per n, since the same group order
+        p^n - 1 is factored over and over (primitivity, element orders,
+        discrete logarithms).
     """
-    
-    # NOTE: design decision to use set data structure, 
-    # as sets provide uniqueness
-    factors = set()
+    factors = []
     
     # We start with the smallest prime
     d = 2
@@ -64,28 +95,60 @@ def prime_factors(n):
     # but in a swapped order, e.g not 3*21 but 21*3, so
     # it is quicker to check just up until sqrt(n)
     while d * d <= n:
+        e = 0
         while n % d == 0:
-            factors.add(d)
+            e += 1
             n //= d
+        if e > 0:
+            factors.append((d, e))
         d += 1
     if n > 1:
-        factors.add(n)
-    return factors
+        factors.append((n, 1))
+    return tuple(factors)
 
+def prime_factors(n):
+    """
+        Get unique prime factors of n.
+        Used for primality check
+    """
+    # NOTE: design decision to use set data structure, 
+    # as sets provide uniqueness
+    return {q for q, _ in factorize(n)}
 
-def finite_field_multiply(f, g, h):
+@instr.timed
+def finite_field_multiply(f, g, h, lazy=True):
     """
         Multiply f and g in the finite field Z_p[X]/(h).
-        Reduces degree during multiplication to keep coefficients in check.
+
+        By default (lazy=True) the products f[i] * g[j] are accumulated as
+        unreduced Python integers, each coefficient is reduced mod p once at
+        the end, and the product is reduced mod h once. Python ints do not
+        overflow, so there is no need to reduce the partial sums early.
+        lazy=False keeps the original row-by-row method, which reduces every
+        scaled row mod p and reduces mod h whenever the degree reaches 2*deg(h).
     """
     p = f.mod
     deg_h = h.degree()
     
     if f.degree() == -1 or g.degree() == -1:
-        return pa.Polynomial([0], p)
+        return pa.Polynomial.zero(p)
     
+    if instr.enabled:
+        instr.count("coefficient_multiplies", len(f.coefficients) * len(g.coefficients))
+
+    if lazy:
+        f_coeffs = f.coefficients
+        acc = [0] * (len(f_coeffs) + len(g.coefficients) - 1)
+        for j, c in enumerate(g.coefficients):
+            if c == 0:
+                continue
+            for i, a in enumerate(f_coeffs):
+                acc[i + j] += a * c
+        # Polynomial reduces every coefficient mod p exactly once
+        return poly_mod_reduction(pa.Polynomial(acc, p), h)
+
     # Start with zero polynomial
-    result = pa.Polynomial([0], p)
+    result = pa.Polynomial.zero(p)
     
     # Multiply term by term and reduce modulo h frequently
     for i in range(len(g.coefficients)):
@@ -105,6 +168,7 @@ def finite_field_multiply(f, g, h):
     result = poly_mod_reduction(result, h)
     return result
 
+@instr.timed
 def finite_field_division(f: pa.Polynomial, g: pa.Polynomial, h: pa.Polynomial):
     """
     Divide f by g in the finite field Z/pZ/(h), by computing the product f * g^(-1)
@@ -131,6 +195,7 @@ def finite_field_division(f: pa.Polynomial, g: pa.Polynomial, h: pa.Polynomial):
 
     return prod
 
+@instr.timed
 def is_primitive(f, h, p):
     """
         Check if f is a primitive element in Z_p[X]/(h).
@@ -166,14 +231,120 @@ def is_primitive(f, h, p):
     return True
 
 
-def power_mod(base, exp, h):
+def _is_one(f):
+    return len(f.coefficients) == 1 and f.coefficients[0] == 1
+
+@instr.timed
+def element_order(f, h):
+    """
+        Multiplicative order of f in Z_p[X]/(h), h irreducible.
+        Starts from the group order N = p^deg(h) - 1 and, for every prime power
+        q^e exactly dividing N, strips q^e off and multiplies back as many
+        factors q as needed for f^order to be 1 again.
+        Returns None for the zero element, which has no order.
+    """
+    p = h.mod
+    f = poly_mod_reduction(f, h)
+    if f.degree() == -1:
+        return None
+    
+    order = p ** h.degree() - 1
+    for q, e in factorize(order):
+        order //= q ** e
+        y = power_mod(f, order, h)
+        while not _is_one(y):
+            y = power_mod(y, q, h)
+            order *= q
+    return order
+
+def _baby_step_giant_step(gamma, target, q, h):
+    """
+        Solves gamma^d = target for 0 <= d < q, where gamma has order q.
+        Returns None if there is no such d.
+    """
+    m = math.isqrt(q - 1) + 1
+    
+    # Baby steps: gamma^j -> j, keyed by the (canonical) coefficient tuple
+    table = {}
+    power = pa.Polynomial.one(h.mod)
+    for j in range(m):
+        table.setdefault(tuple(power.coefficients), j)
+        power = finite_field_multiply(power, gamma, h)
+    
+    # Giant steps: target * gamma^(-m*i)
+    giant = finite_field_inversion(power, h)
+    y = poly_mod_reduction(target, h)
+    for i in range(m):
+        j = table.get(tuple(y.coefficients))
+        if j is not None:
+            return (i * m + j) % q
+        y = finite_field_multiply(y, giant, h)
+    return None
+
+@instr.timed
+def discrete_log(base, target, h):
+    """
+        Discrete logarithm in Z_p[X]/(h), h irreducible: the smallest x >= 0
+        with base^x = target, or None if target is not a power of base.
+        
+        Uses Pohlig-Hellman: for every prime power q^e dividing the order of
+        base, the digits of x mod q^e are found one by one with baby-step
+        giant-step in the subgroup of order q, and the results are combined
+        with the Chinese remainder theorem. Practical as long as the largest
+        prime factor of p^deg(h) - 1 is small enough for a table of about
+        its square root in size.
+    """
+    base = poly_mod_reduction(base, h)
+    target = poly_mod_reduction(target, h)
+    if base.degree() == -1 or target.degree() == -1:
+        return None
+    
+    order = element_order(base, h)
+    base_inv = finite_field_inversion(base, h)
+    x, modulus = 0, 1
+    
+    # The order of base divides p^n - 1, whose factorization is cached
+    for q, _ in factorize(h.mod ** h.degree() - 1):
+        # Exponent of q in the order of base (may be 0)
+        e = 0
+        while order % (q ** (e + 1)) == 0:
+            e += 1
+        if e == 0:
+            continue
+        gamma = power_mod(base, order // q, h)   # has order q
+        x_q = 0
+        for k in range(e):
+            # Strip the digits found so far and project onto the order-q subgroup
+            stripped = finite_field_multiply(power_mod(base_inv, x_q, h), target, h)
+            d = _baby_step_giant_step(gamma, power_mod(stripped, order // q ** (k + 1), h), q, h)
+            if d is None:
+                return None
+            x_q += d * q ** k
+        
+        # Chinese remainder: combine x mod modulus with x_q mod q^e
+        q_e = q ** e
+        t = (x_q - x) * pow(modulus, -1, q_e) % q_e
+        x, modulus = x + modulus * t, modulus * q_e
+    
+    # The target may lie outside the subgroup generated by base
+    if power_mod(base, x, h).coefficients != target.coefficients:
+        return None
+    return x
+
+@instr.timed
+def power_mod(base, exp, h, normal_basis=None):
     """
         Helper function to compute base^exp mod h efficiently using RTL square and multiply method.
         Reduces modulo h at each step to keep polynomials small.
+
+        If a normal_basis.NormalBasis of Z_p[X]/(h) is given, the power is
+        computed in that basis instead, where p-th powers are cyclic shifts.
     """
+    if normal_basis is not None:
+        return normal_basis.from_normal(normal_basis.power(normal_basis.to_normal(base), exp))
+
     p = base.mod
-    result = pa.Polynomial([1], p)
-    base = pa.Polynomial(base.coefficients[:], p)
+    result = pa.Polynomial.one(p)
     
     # Ensure base is already reduced
     base = poly_mod_reduction(base, h)
@@ -190,22 +361,204 @@ def power_mod(base, exp, h):
     result = poly_mod_reduction(result, h)
     return result
 
-def generate_polynomial_h(h: pa.Polynomial):
+@instr.timed
+def compose_mod(f, g, h):
+    """
+        Computes f(g) mod h with the Brent-Kung baby-step/giant-step method.
+
+        With m about sqrt(deg(f) + 1), the powers g^0, ..., g^m mod h are
+        precomputed (baby steps) and f is cut into blocks of m coefficients,
+        f = F_0 + F_1 * Y + F_2 * Y^2 + ... with Y = X^m. Every F_j(g) is then
+        just a linear combination of the precomputed powers (no field
+        multiplications), and the blocks are combined by Horner's rule in
+        g^m (giant steps). That takes about 2 * sqrt(deg(f)) field
+        multiplications instead of the deg(f) of plain Horner.
+
+        Args:
+            f: polynomial to evaluate (any degree)
+            g: element of Z_p[X]/(h) to substitute for X
+            h: modulus polynomial
+    """
+    p = h.mod
+    deg_f = f.degree()
+    if deg_f == -1:
+        return pa.Polynomial.zero(p)
+    
+    g = poly_mod_reduction(g, h)
+    m = max(1, math.isqrt(deg_f + 1))
+    if m * m < deg_f + 1:
+        m += 1
+    
+    # Baby steps: powers[i] = g^i mod h, for 0 <= i <= m
+    powers = [pa.Polynomial.one(p)]
+    for _ in range(m):
+        powers.append(finite_field_multiply(powers[-1], g, h))
+    giant = powers[m]
+    
+    n = max(h.degree(), 1)
+    coeffs = f.coefficients
+    result = pa.Polynomial.zero(p)
+    
+    # Giant steps, from the highest block down
+    for start in range(m * (deg_f // m), -1, -m):
+        # F_j(g) as an unreduced linear combination of the baby steps
+        block = [0] * n
+        for i, c in enumerate(coeffs[start:start + m]):
+            if c == 0:
+                continue
+            for k, e in enumerate(powers[i].coefficients):
+                block[k] += c * e
+        result = finite_field_multiply(result, giant, h) + pa.Polynomial(block, p)
+    
+    return poly_mod_reduction(result, h)
+
+def x_frobenius_power(h, k):
+    """
+        Computes X^(p^k) mod h. X^p mod h is found by one exponentiation, and
+        the rest by modular composition, doubling k like square-and-multiply:
+        X^(p^(i+j)) = (X^(p^i)) composed with X^(p^j) (mod h).
+    """
+    p = h.mod
+    x = pa.Polynomial.x(p)
+    if k == 0:
+        return poly_mod_reduction(x, h)
+    
+    frob = power_mod(x, p, h)   # X^(p^1)
+    result = None
+    while k > 0:
+        if k % 2 == 1:
+            result = frob if result is None else compose_mod(result, frob, h)
+        k //= 2
+        if k > 0:
+            frob = compose_mod(frob, frob, h)
+    return result
+
+def frobenius_map(f, h, k=1):
+    """
+        Applies the k-th power of the Frobenius map to f in Z_p[X]/(h), i.e.
+        computes f^(p^k) mod h as f(X^(p^k)) by modular composition. This
+        holds for any h, since f(X)^p = f(X^p) over Z/pZ.
+    """
+    return compose_mod(f, x_frobenius_power(h, k), h)
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _monomial_traces(h):
+    """
+        Traces Tr(X^i), 0 <= i < n, in Z_p[X]/(h), cached per h (polynomials
+        are hashable). Tr(X^i) is the power sum s_i of the roots of h,
+        which Newton's identities give straight from the coefficients of the
+        monic h = X^n + c_(n-1) X^(n-1) + ... + c_0:
+            s_k = -(c_(n-1) s_(k-1) + ... + c_(n-k+1) s_1 + k * c_(n-k))
+    """
+    p, h_coeffs = h.mod, h.coefficients
+    n = len(h_coeffs) - 1
+    lead_inv = pow(h_coeffs[-1], p - 2, p)
+    c = [a * lead_inv % p for a in h_coeffs]
+    traces = [n % p]
+    for k in range(1, n):
+        s_k = k * c[n - k]
+        for i in range(1, k):
+            s_k += c[n - i] * traces[k - i]
+        traces.append(-s_k % p)
+    return tuple(traces)
+
+def field_trace(f, h):
+    """
+        Trace Tr(f) = f + f^p + ... + f^(p^(n-1)) of f in Z_p[X]/(h), an
+        element of Z/pZ. The trace is linear, so with the (cached) traces of
+        the monomials X^i this is a single dot product with the coefficients
+        of f, instead of n exponentiations.
+    """
+    p = h.mod
+    f = poly_mod_reduction(f, h)
+    traces = _monomial_traces(h)
+    return sum(a * t for a, t in zip(f.coefficients, traces)) % p
+
+def field_norm(f, h):
+    """
+        Norm N(f) = f * f^p * ... * f^(p^(n-1)) of f in Z_p[X]/(h), an element
+        of Z/pZ. For monic h this is the product of f over the roots of h,
+        i.e. the resultant Res(h, f), computed with the Euclidean algorithm
+        (pa.poly_resultant) instead of n exponentiations.
+    """
+    p = h.mod
+    f = poly_mod_reduction(f, h)
+    # Res(h, f) = lc(h)^deg(f) * N(f)
+    lead_inv = pow(h.coefficients[-1], p - 2, p)
+    return pa.poly_resultant(h, f) * pow(lead_inv, max(f.degree(), 0), p) % p
+
+@instr.timed
+def find_roots(f, rng=None):
+    """
+    Returns the distinct roots of f in Z/pZ, sorted.
+
+    The roots of f are the roots of its split part g = gcd(f, X^p - X),
+    which is a product of distinct linear factors; X^p mod f is computed by
+    exponentiation, so this never touches all p elements. g is then split
+    recursively (Cantor-Zassenhaus): for random a, gcd(g, (X + a)^((p-1)/2) - 1)
+    collects the roots r for which r + a is a nonzero square, which is a
+    proper factor about half of the time. Expected polynomial time in log p.
+
+    Args:
+        f: polynomial over Z/pZ (nonzero)
+        rng: optional random.Random instance or integer seed (see pa.resolve_rng)
+    """
+    p = f.mod
+    if f.degree() == -1:
+        raise ValueError("every element is a root of the zero polynomial")
+    if f.degree() == 0:
+        return []
+    if p == 2:
+        return [a for a in (0, 1) if pa.poly_evaluate(f, a) == 0]
+
+    rng = pa.resolve_rng(rng)
+    x = pa.Polynomial.x(p)
+    split = pa.poly_gcd(f, power_mod(x, p, f) - x)
+
+    roots = []
+    pending = [split]
+    while pending:
+        g = pending.pop()
+        if g.degree() <= 0:
+            continue
+        if g.degree() == 1:
+            # g is monic: X + c, with root -c
+            roots.append(-g.coefficients[0] % p)
+            continue
+        while True:
+            a = rng.randint(0, p - 1)
+            s = power_mod(pa.Polynomial([a, 1], p), (p - 1) // 2, g) - pa.Polynomial.one(p)
+            d = pa.poly_gcd(g, s)
+            if 0 < d.degree() < g.degree():
+                pending.append(d)
+                pending.append(pa.polynomial_LD(g, d)[0])
+                break
+    return sorted(roots)
+
+def generate_polynomial_h(h: pa.Polynomial, rng=None):
     """
     Helper function to generate a random polynomial in Z/pZ/(h) with deg < deg(h)
     Coefficients are sampled uniformly from the set {0, 1, ..., p-1}
 
     Args:
         h: modulus polynomial in the given field; irreducible; determines the maximal degree
+        rng: optional random.Random instance or integer seed (see pa.resolve_rng)
     """
     p = h.mod
     n = h.degree()
+    rng = pa.resolve_rng(rng)
     
     # Generate polynomial with degree < deg(h)
-    coeffs = [random.randint(0, p - 1) for _ in range(n)]
+    coeffs = [rng.randint(0, p - 1) for _ in range(n)]
     return pa.Polynomial(coeffs, p)
 
-def primitive_generation(h: pa.Polynomial, p: int):
+def _primitive_candidate(h, p, rng):
+    """ One random element of Z_p[X]/(h), if it is primitive, else None. """
+    f = generate_polynomial_h(h, rng)
+    return f if is_primitive(f, h, p) else None
+
+@instr.timed
+def primitive_generation(h: pa.Polynomial, p: int, rng=None, workers=None):
     """
     Compute a primitive polynomial in a given field Z/pZ/(h) by randomly sampling polynomials 
         until a primitive one is found.
@@ -213,11 +566,18 @@ def primitive_generation(h: pa.Polynomial, p: int):
     Args:
         h: modulus polynomial in the given field; irreducible
         p: Prime modulus of the coefficient field
+        rng: optional random.Random instance or integer seed (see pa.resolve_rng)
+        workers: optional number of processes to test candidates on in parallel
+                 (see parallel_search)
     """
     p = h.mod
+    # Resolve once, so that a seed gives one stream for all the samples
+    rng = pa.resolve_rng(rng)
+    if workers is not None and workers > 1:
+        return parallel_search.first_success(_primitive_candidate, (h, p), rng, workers)
     
     while True:
         # If a primitive element is found, return the polynomial
-        f = generate_polynomial_h(h)
-        if is_primitive(f, h, p):
-            return f
\ No newline at end of file
+        f = _primitive_candidate(h, p, rng)
+        if f is not None:
+            return f
@@ -0,0 +1,109 @@
+##
+# Opt-in operation counters and timings for the arithmetic core.
+#
+# Nothing is recorded unless a collect() block is active:
+#
+#   with instrumentation.collect() as stats:
+#       ffa.is_primitive(f, h, p)
+#   print(stats.as_dict())
+#
+# When disabled, the hot paths only pay for one 'if instrumentation.enabled'
+# check, and the timed functions for one extra call.
+#
+# The Stats being filled are per thread, so concurrent collect() blocks (e.g.
+# the solver daemon in --threads mode) each see only their own operations.
+# 'enabled' is shared: it is True while any thread is inside a collect()
+# block, and the recording functions then look up the calling thread's Stats
+# and do nothing if it has none.
+##
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Checked directly by the hot paths; only collect() should flip it.
+enabled = False
+
+# Number of active collect() blocks over all threads, guarded by _lock
+_active = 0
+_lock = threading.Lock()
+
+# .current: Stats of the innermost collect() block of the thread, if any
+_local = threading.local()
+
+
+class Stats:
+    """
+    Counters and per-function timings gathered during one collect() block.
+
+    counts maps a counter name (e.g. "constructions", "coefficient_multiplies",
+    "reductions", "divisions") to its total; timings maps a function name to
+    [number of calls, total seconds]. Timings are inclusive, so a power_mod
+    also contains the time of the finite_field_multiply calls it makes.
+    """
+    def __init__(self):
+        self.counts = {}
+        self.timings = {}
+
+    def as_dict(self):
+        """ JSON-serializable view of the stats. """
+        return {
+            "counts": dict(self.counts),
+            "timings": {name: {"calls": calls, "seconds": total}
+                        for name, (calls, total) in self.timings.items()},
+        }
+
+
+def count(name, amount=1):
+    """ Adds amount to the counter name. Callers check 'enabled' first. """
+    stats = getattr(_local, "current", None)
+    if stats is None:
+        return
+    counts = stats.counts
+    counts[name] = counts.get(name, 0) + amount
+
+
+def timed(func):
+    """ Decorator recording the number of calls and total time of func. """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        stats = getattr(_local, "current", None)
+        if stats is None:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            entry = stats.timings.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+    return wrapper
+
+
+@contextmanager
+def collect():
+    """
+    Enables instrumentation for the duration of the block and yields the Stats
+    object it fills. Blocks may be nested; the inner one then gets its own
+    Stats and the outer one resumes afterwards. Blocks in different threads
+    are independent.
+    """
+    global enabled, _active
+    previous = getattr(_local, "current", None)
+    stats = Stats()
+    _local.current = stats
+    with _lock:
+        _active += 1
+        enabled = True
+    try:
+        yield stats
+    finally:
+        _local.current = previous
+        with _lock:
+            _active -= 1
+            enabled = _active > 0
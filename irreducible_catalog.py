@@ -0,0 +1,260 @@
+##
+# Precomputed catalog of irreducible polynomials, keyed by (p, n).
+#
+# The catalog lives in irreducible_catalog.txt, one polynomial per line:
+#
+#   p n kind e:c e:c ...
+#
+# where the e:c pairs are the nonzero terms c * X^e (so trinomials stay three
+# terms long, however big n is). Kinds, in order of preference for lookup:
+#   conway     - the Conway polynomial C_{p,n}
+#   primitive  - an irreducible polynomial for which X is primitive
+#   lowweight  - an irreducible polynomial with the fewest nonzero terms
+#                (binomial, trinomial, pentanomial, ...)
+# Lines starting with '#' are comments.
+#
+# The file is only read on the first lookup. To extend it, run e.g.
+#   python irreducible_catalog.py extend 3 2-6 --kinds conway,lowweight
+# which searches the missing entries offline and appends them.
+##
+
+import argparse
+import itertools
+import os
+import sys
+
+import poly_arithmetic as pa
+import finite_field_arithmetic as ffa
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "irreducible_catalog.txt")
+
+KINDS = ("conway", "primitive", "lowweight")
+
+# (p, n) -> {kind: coefficient list}; None until the first lookup
+_index = None
+
+
+def parse_line(line):
+    """ Parses one catalog line into (p, n, kind, coefficients). """
+    fields = line.split()
+    p, n, kind = int(fields[0]), int(fields[1]), fields[2]
+    coeffs = [0] * (n + 1)
+    for term in fields[3:]:
+        e, c = term.split(":")
+        coeffs[int(e)] = int(c)
+    return p, n, kind, coeffs
+
+
+def format_line(p, kind, f):
+    """ Formats polynomial f as a catalog line. """
+    terms = ["%d:%d" % (e, c) for e, c in enumerate(f.coefficients) if c != 0]
+    return "%d %d %s %s" % (p, f.degree(), kind, " ".join(terms))
+
+
+def load_catalog(path=CATALOG_PATH):
+    """ Reads a catalog file into a (p, n) -> {kind: coefficients} dict. """
+    index = {}
+    if not os.path.exists(path):
+        return index
+    with open(path, "r") as catalog_file:
+        for line in catalog_file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            p, n, kind, coeffs = parse_line(line)
+            # Keep the first entry of each kind, later duplicates are ignored
+            index.setdefault((p, n), {}).setdefault(kind, coeffs)
+    return index
+
+
+def _get_index():
+    global _index
+    if _index is None:
+        _index = load_catalog()
+    return _index
+
+
+def lookup(p, n, kind=None):
+    """
+    Returns a catalogued irreducible polynomial of degree n over Z/pZ, or None
+    if the catalog has none. With kind=None the most structured entry is
+    returned (see KINDS for the order), otherwise only that kind.
+    """
+    entries = _get_index().get((p, n))
+    if not entries:
+        return None
+    for k in (KINDS if kind is None else (kind,)):
+        if k in entries:
+            return pa.Polynomial(entries[k], p)
+    return None
+
+
+def known_primitive_element(h):
+    """
+    Returns X mod h if h is a catalogued Conway or primitive polynomial (so
+    that X is known to be a primitive element of Z_p[X]/(h)), otherwise None.
+    For degree 1 that is the constant -h[0], not X itself.
+    """
+    entries = _get_index().get((h.mod, h.degree()), {})
+    for kind in ("conway", "primitive"):
+        if entries.get(kind) == h.coefficients:
+            return ffa.poly_mod_reduction(pa.Polynomial.x(h.mod), h)
+    return None
+
+
+# --- Offline generation ---
+
+def _is_primitive_polynomial(f):
+    """ f irreducible and X primitive in Z_p[X]/(f). """
+    if not pa.poly_irreducibility_check(f):
+        return False
+    # For deg(f) = 1, Z_p[X]/(f) is Z/pZ and X reduces to a constant
+    x = ffa.poly_mod_reduction(pa.Polynomial.x(f.mod), f)
+    return ffa.is_primitive(x, f, f.mod)
+
+
+def _evaluate(f, g, h):
+    """ f(g) mod h by Horner's rule, with g an element of Z_p[X]/(h). """
+    result = pa.Polynomial.zero(h.mod)
+    for c in reversed(f.coefficients):
+        result = ffa.finite_field_multiply(result, g, h) + pa.Polynomial([c], h.mod)
+    return ffa.poly_mod_reduction(result, h)
+
+
+def conway_polynomial(p, n, catalog=None):
+    """
+    Computes the Conway polynomial C_{p,n} by brute force: the first primitive
+    polynomial, in Conway's order, whose root raised to (p^n-1)/(p^m-1) is a
+    root of C_{p,m} for every proper divisor m of n. The order compares
+    (a_1, ..., a_n) lexicographically, where the coefficient of X^(n-i) is
+    (-1)^i * a_i. Only feasible for small p^n; the C_{p,m} are taken from
+    catalog when present and computed recursively otherwise.
+    """
+    if catalog is None:
+        catalog = _get_index()
+    subfields = []
+    for m in range(1, n):
+        if n % m == 0:
+            known = catalog.get((p, m), {}).get("conway")
+            c_m = pa.Polynomial(known, p) if known else conway_polynomial(p, m, catalog)
+            subfields.append((m, c_m))
+
+    for a in itertools.product(range(p), repeat=n):
+        coeffs = [0] * (n + 1)
+        coeffs[n] = 1
+        for i in range(1, n + 1):
+            coeffs[n - i] = ((-1) ** i * a[i - 1]) % p
+        f = pa.Polynomial(coeffs, p)
+        if coeffs[0] == 0 or not _is_primitive_polynomial(f):
+            continue
+        x = pa.Polynomial.x(p)
+        compatible = True
+        for m, c_m in subfields:
+            g = ffa.power_mod(x, (p ** n - 1) // (p ** m - 1), f)
+            if _evaluate(c_m, g, f).degree() != -1:
+                compatible = False
+                break
+        if compatible:
+            return f
+    return None
+
+
+def _lowweight_candidates(p, n):
+    """
+    Yields the monic polynomials X^n + ... + c (c != 0) of degree n ordered by
+    number of nonzero terms (binomials, then trinomials, ...), and within one
+    weight lexicographically by exponents and coefficients.
+    """
+    for extra in range(0, n):
+        # 'extra' middle terms between X^n and the constant
+        for exps in itertools.combinations(range(1, n), extra):
+            for cs in itertools.product(range(1, p), repeat=extra + 1):
+                coeffs = [0] * (n + 1)
+                coeffs[n] = 1
+                coeffs[0] = cs[0]
+                for e, c in zip(exps, cs[1:]):
+                    coeffs[e] = c
+                yield pa.Polynomial(coeffs, p)
+
+
+def lowweight_irreducible(p, n):
+    """ The first irreducible polynomial of degree n in _lowweight_candidates order. """
+    for f in _lowweight_candidates(p, n):
+        if pa.poly_irreducibility_check(f):
+            return f
+    return None
+
+
+def primitive_polynomial(p, n):
+    """ The first primitive polynomial of degree n in _lowweight_candidates order. """
+    for f in _lowweight_candidates(p, n):
+        if _is_primitive_polynomial(f):
+            return f
+    return None
+
+
+GENERATORS = {
+    "conway": conway_polynomial,
+    "primitive": lambda p, n, catalog=None: primitive_polynomial(p, n),
+    "lowweight": lambda p, n, catalog=None: lowweight_irreducible(p, n),
+}
+
+
+def extend(p, degrees, kinds=KINDS, path=CATALOG_PATH, log=None):
+    """
+    Generates the missing (p, n, kind) entries for n in degrees and appends
+    them to the catalog file. Returns the number of entries added.
+    """
+    global _index
+    catalog = load_catalog(path)
+    added = 0
+    with open(path, "a") as catalog_file:
+        for n in degrees:
+            for kind in kinds:
+                if kind in catalog.get((p, n), {}):
+                    continue
+                f = GENERATORS[kind](p, n, catalog=catalog)
+                if f is None:
+                    continue
+                line = format_line(p, kind, f)
+                catalog_file.write(line + "\n")
+                catalog.setdefault((p, n), {})[kind] = f.coefficients
+                added += 1
+                if log is not None:
+                    log(line)
+    # Make the next lookup see the new entries
+    _index = None
+    return added
+
+
+def _parse_degrees(text):
+    """ "2-6" -> [2, 3, 4, 5, 6], "2,5" -> [2, 5]. """
+    degrees = []
+    for part in text.split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            degrees.extend(range(int(lo), int(hi) + 1))
+        else:
+            degrees.append(int(part))
+    return degrees
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Irreducible polynomial catalog tool.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ext = sub.add_parser("extend", help="generate missing entries offline")
+    ext.add_argument("p", type=int)
+    ext.add_argument("degrees", help="e.g. 2-8 or 2,3,5")
+    ext.add_argument("--kinds", default=",".join(KINDS))
+    ext.add_argument("--path", default=CATALOG_PATH)
+    args = parser.parse_args(argv)
+
+    added = extend(args.p, _parse_degrees(args.degrees),
+                   kinds=args.kinds.split(","), path=args.path, log=print)
+    print("Added %d entries" % added)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+##
+# Small dense linear algebra over Z/pZ, used for the basis changes between
+# representations of finite fields. Matrices are lists of rows, vectors are
+# lists; all entries are integers in [0, p).
+##
+
+
+def coefficient_vector(f, n):
+    """ Coefficient vector of the polynomial f, padded with zeros to length n. """
+    coeffs = f.coefficients if f.degree() != -1 else []
+    return coeffs + [0] * (n - len(coeffs))
+
+
+def matrix_vector(M, v, p):
+    """ M * v mod p. """
+    return [sum(a * b for a, b in zip(row, v)) % p for row in M]
+
+
+def matrix_multiply(A, B, p):
+    """ A * B mod p. """
+    columns = list(zip(*B))
+    return [[sum(a * b for a, b in zip(row, col)) % p for col in columns] for row in A]
+
+
+def identity_matrix(n):
+    return [[1 if i == j else 0 for j in range(n)] for i in range(n)]
+
+
+def matrix_inverse(M, p):
+    """
+    Inverse of the square matrix M mod p, by Gauss-Jordan elimination.
+    Raises ValueError if M is singular mod p.
+    """
+    n = len(M)
+    # Augment [M | I] and reduce the left half to the identity
+    rows = [list(row) + unit for row, unit in zip(M, identity_matrix(n))]
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if rows[r][col] % p != 0), None)
+        if pivot is None:
+            raise ValueError("matrix is singular mod %d" % p)
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        inv = pow(rows[col][col], p - 2, p)
+        rows[col] = [a * inv % p for a in rows[col]]
+        for r in range(n):
+            if r != col and rows[r][col] != 0:
+                factor = rows[r][col]
+                rows[r] = [(a - factor * b) % p for a, b in zip(rows[r], rows[col])]
+    return [row[n:] for row in rows]
@@ -0,0 +1,70 @@
+##
+# Linear recurrences over Z/pZ, e.g. for LFSR analysis.
+#
+# A sequence s satisfies the recurrence with monic characteristic polynomial
+#   h = X^L + h[L-1] X^(L-1) + ... + h[0]
+# when s[n + L] = -(h[L-1] s[n + L - 1] + ... + h[0] s[n]) for all n >= 0.
+# Berlekamp-Massey finds the h of least degree L (the linear complexity of
+# the sequence) from the first 2L terms. The N-th term then follows from
+# Fiduccia's algorithm: if X^N mod h = sum r[i] X^i, then s[N] = sum r[i] s[i],
+# so only log(N) squarings in Z_p[X]/(h) are needed (ffa.power_mod).
+##
+
+import poly_arithmetic as pa
+import finite_field_arithmetic as ffa
+
+
+def berlekamp_massey(sequence, p):
+    """
+    Minimal (monic characteristic) polynomial of the sequence over Z/pZ, p
+    prime; its degree is the linear complexity. For a sequence generated by a
+    recurrence of order L, the first 2L terms determine it.
+    """
+    s = [x % p for x in sequence]
+    # Connection polynomial C = 1 + C[1] X + ... (s[n] + sum C[i] s[n-i] = 0),
+    # and B, the value of C before the last length change
+    C, B = [1], [1]
+    L, m, b = 0, 1, 1
+    for n in range(len(s)):
+        d = s[n]
+        for i in range(1, L + 1):
+            d += C[i] * s[n - i]
+        d %= p
+        if d == 0:
+            m += 1
+            continue
+        coef = d * pow(b, p - 2, p) % p
+        previous = C[:]
+        C = C + [0] * (len(B) + m - len(C))
+        for i, c in enumerate(B):
+            C[i + m] = (C[i + m] - coef * c) % p
+        if 2 * L <= n:
+            L, B, b, m = n + 1 - L, previous, d, 1
+        else:
+            m += 1
+    # h(X) = X^L * C(1/X)
+    C = C + [0] * (L + 1 - len(C))
+    return pa.Polynomial(C[L::-1], p)
+
+
+def nth_term(initial, h, n):
+    """
+    Term n of the sequence with characteristic polynomial h (over Z/h.mod Z)
+    and first terms initial[0 .. deg(h) - 1], by Fiduccia's algorithm:
+    s[n] = sum r[i] * initial[i] with r = X^n mod h.
+    """
+    p = h.mod
+    if n < len(initial):
+        return initial[n] % p
+    r = ffa.power_mod(pa.Polynomial.x(p), n, h)
+    if r.degree() == -1:
+        return 0
+    return sum(c * s for c, s in zip(r.coefficients, initial)) % p
+
+
+def predict(sequence, n, p):
+    """
+    Term n of the shortest linear recurrence generating sequence (which must
+    hold at least twice as many terms as the linear complexity).
+    """
+    return nth_term(sequence, berlekamp_massey(sequence, p), n)
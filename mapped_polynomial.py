@@ -0,0 +1,257 @@
+##
+# Out-of-core polynomials over Z/pZ, stored in memory-mapped files.
+#
+# File format (all integers little-endian):
+#
+#   offset 0   4 bytes   magic b"PMAP"
+#          4   uint16    format version (1)
+#          6   uint16    width w: bytes per coefficient, enough for p - 1
+#          8   int64     degree (-1 for the zero polynomial)
+#         16   w bytes   p
+#     16 + w   w bytes   coefficient of X^0, then X^1, ... up to X^degree
+#
+# The operations below stream over the file BLOCK coefficients at a time,
+# so only a few blocks are ever held as Python ints. Products are formed
+# block by block: output block d collects f_i * g_(d-i) for all i. Each block
+# product is a single multiplication of two huge numbers through Kronecker
+# substitution (the coefficients packed into fixed-width decimal digit slots).
+# The numbers are Decimals because libmpdec multiplies large operands with a
+# number-theoretic transform, while CPython ints only have Karatsuba; at 2^16
+# coefficients per block that is about 9x faster.
+#
+# The encoding and packing helpers (coefficient_width, encode, decode, pack,
+# unpack, EXACT) are also used by shared_multiply.
+##
+
+import array
+import decimal
+import mmap
+import struct
+import sys
+
+import poly_arithmetic as pa
+
+MAGIC = b"PMAP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHq")
+
+# Coefficients per block for the streaming operations. Products cost about
+# (number of blocks)^2 block products, each O(b log b), so multiply takes
+# bigger blocks.
+BLOCK = 1 << 16
+MULTIPLY_BLOCK = 1 << 18
+
+_ARRAY_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+# Exact decimal arithmetic on integers of any length
+EXACT = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+
+
+def coefficient_width(p):
+    """ Bytes per stored coefficient for Z/pZ. """
+    return max(1, ((p - 1).bit_length() + 7) // 8)
+
+
+def decode(data, width):
+    """ Coefficients stored in data with width bytes each. """
+    code = _ARRAY_CODES.get(width)
+    if code is not None and sys.byteorder == "little" and array.array(code).itemsize == width:
+        return array.array(code, bytes(data)).tolist()
+    return [int.from_bytes(data[i:i + width], "little") for i in range(0, len(data), width)]
+
+
+def encode(values, width):
+    """ Inverse of decode; every value must fit in width bytes. """
+    code = _ARRAY_CODES.get(width)
+    if code is not None and sys.byteorder == "little" and array.array(code).itemsize == width:
+        return array.array(code, values).tobytes()
+    return b"".join(v.to_bytes(width, "little") for v in values)
+
+
+class MappedPolynomial:
+    """
+    Polynomial over Z/pZ whose coefficients live in a memory-mapped file (see
+    the format above). Open an existing file with MappedPolynomial(path), or
+    make a new one with create / from_polynomial. Use as a context manager, or
+    call close() when done.
+
+    Attributes:
+        mod: the prime p
+        width: bytes per stored coefficient
+    """
+    def __init__(self, path, writable=False):
+        self.path = path
+        self._file = open(path, "r+b" if writable else "rb")
+        self._writable = writable
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, self.width, self._degree = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%s is not a mapped polynomial file" % path)
+        start = _HEADER.size
+        self.mod = int.from_bytes(self._map[start:start + self.width], "little")
+        self._offset = start + self.width
+
+    @classmethod
+    def create(cls, path, p, degree):
+        """ New file for a polynomial of the given degree, all coefficients 0. """
+        width = coefficient_width(p)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, width, degree))
+            f.write(p.to_bytes(width, "little"))
+            f.truncate(_HEADER.size + width + width * (degree + 1))
+        return cls(path, writable=True)
+
+    @classmethod
+    def from_polynomial(cls, f, path):
+        """ Writes Polynomial f to a new file at path. """
+        result = cls.create(path, f.mod, f.degree())
+        if f.degree() != -1:
+            for start in range(0, len(f.coefficients), BLOCK):
+                result.write_block(start, f.coefficients[start:start + BLOCK])
+        return result
+
+    def to_polynomial(self):
+        """ The whole polynomial as an in-memory Polynomial. """
+        return pa.Polynomial(self.read_block(0, self._degree + 1), self.mod)
+
+    def degree(self):
+        return self._degree
+
+    def read_block(self, start, count):
+        """ Coefficients of X^start .. X^(start + count - 1), clipped to the degree. """
+        stop = min(start + count, self._degree + 1)
+        if stop <= start:
+            return []
+        w = self.width
+        return decode(self._map[self._offset + start * w:self._offset + stop * w], w)
+
+    def write_block(self, start, values):
+        """ Overwrites the coefficients from X^start on with values (in [0, p)). """
+        w = self.width
+        self._map[self._offset + start * w:self._offset + (start + len(values)) * w] = \
+            encode(values, w)
+
+    def blocks(self, block=BLOCK):
+        """ Yields (start, coefficients) for consecutive blocks, lowest first. """
+        for start in range(0, self._degree + 1, block):
+            yield start, self.read_block(start, block)
+
+    def trim(self, block=BLOCK):
+        """ Lowers the stored degree past leading zero coefficients. """
+        degree = self._degree
+        while degree >= 0:
+            start = max(0, degree + 1 - block)
+            values = self.read_block(start, degree + 1 - start)
+            while values and values[-1] == 0:
+                values.pop()
+            degree = start + len(values) - 1
+            if values:
+                break
+        self._degree = degree
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, self.width, degree)
+
+    def flush(self):
+        if self._writable:
+            self._map.flush()
+
+    def close(self):
+        self.flush()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _add_or_sub(a, b, path, sign, block):
+    if a.mod != b.mod:
+        raise ValueError("polynomials over different moduli")
+    p = a.mod
+    result = MappedPolynomial.create(path, p, max(a.degree(), b.degree()))
+    for start in range(0, result.degree() + 1, block):
+        x, y = a.read_block(start, block), b.read_block(start, block)
+        length = max(len(x), len(y))
+        x += [0] * (length - len(x))
+        y += [0] * (length - len(y))
+        result.write_block(start, [(u + sign * v) % p for u, v in zip(x, y)])
+    result.trim(block)
+    return result
+
+
+def add(a, b, path, block=BLOCK):
+    """ a + b, streamed block by block into a new file at path. """
+    return _add_or_sub(a, b, path, 1, block)
+
+
+def sub(a, b, path, block=BLOCK):
+    """ a - b, streamed block by block into a new file at path. """
+    return _add_or_sub(a, b, path, -1, block)
+
+
+def pack(values, digits):
+    """ Kronecker substitution: sum of values[i] * 10^(digits * i), as a Decimal. """
+    return decimal.Decimal("".join(str(v).zfill(digits) for v in reversed(values)))
+
+
+def unpack(x, digits, count):
+    """ The count base-10^digits slots of x, lowest first. """
+    s = str(x).zfill(count * digits)
+    return [int(s[i - digits:i]) for i in range(len(s), 0, -digits)]
+
+
+def multiply(a, b, path, block=MULTIPLY_BLOCK):
+    """
+    a * b into a new file at path. Output block d is the sum of the block
+    products a_i * b_(d-i), each a single packed product; the sums are
+    accumulated packed and unpacked once per output block, and the upper
+    half of each unpacked block is carried into the next one.
+    """
+    if a.mod != b.mod:
+        raise ValueError("polynomials over different moduli")
+    p = a.mod
+    if a.degree() == -1 or b.degree() == -1:
+        return MappedPolynomial.create(path, p, -1)
+    nb_a = a.degree() // block + 1
+    nb_b = b.degree() // block + 1
+    # Each slot holds a sum of at most block * min(nb_a, nb_b) products < p^2
+    digits = len(str((p - 1) ** 2 * block * min(nb_a, nb_b)))
+
+    result = MappedPolynomial.create(path, p, a.degree() + b.degree())
+    length = result.degree() + 1
+    carry = [0] * block
+    for d in range(nb_a + nb_b - 1):
+        acc = decimal.Decimal(0)
+        for i in range(max(0, d - nb_b + 1), min(d, nb_a - 1) + 1):
+            product = EXACT.multiply(pack(a.read_block(i * block, block), digits),
+                                      pack(b.read_block((d - i) * block, block), digits))
+            acc = EXACT.add(acc, product)
+        window = unpack(acc, digits, 2 * block)
+        low = [(x + c) % p for x, c in zip(window[:block], carry)]
+        carry = window[block:]
+        start = d * block
+        result.write_block(start, low[:max(0, min(block, length - start))])
+    start = (nb_a + nb_b - 1) * block
+    if start < length:
+        result.write_block(start, [c % p for c in carry[:length - start]])
+    return result
+
+
+def mod_reduction(a, h, block=BLOCK):
+    """
+    a mod h as a Polynomial, for an in-memory h of small degree. The blocks
+    of a are folded in from the top, Horner style: r = (r * X^block + a_i) mod h.
+    """
+    p = a.mod
+    if a.degree() == -1:
+        return pa.Polynomial.zero(p)
+    r = []
+    for start in range(a.degree() // block * block, -1, -block):
+        values = a.read_block(start, block)
+        values += [0] * (block - len(values))
+        r = pa.polynomial_LD(pa.Polynomial(values + r, p), h)[1]
+        r = r.coefficients if r.degree() != -1 else []
+    return pa.Polynomial(r or [0], p)
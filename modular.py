@@ -0,0 +1,95 @@
+##
+# Barrett and Montgomery reduction for coefficients modulo a (large) prime p.
+#
+# Both replace the division in 'x % p' by multiplications and shifts, using
+# constants precomputed once per modulus; get_barrett(p)/get_montgomery(p)
+# cache those per p. Montgomery elements live in the form a*R mod p (with
+# R = 2^k > p) and only convert back at output, so that a chain of
+# multiplications pays one REDC per product.
+#
+# Note that in CPython the builtin '%' runs in C while these reductions run as
+# several interpreted big-int operations, so the benchmark suite
+# (benchmark.py, ops reduce_*) is what decides whether they pay off for a
+# given p; the polynomial code itself saves its divisions by reducing lazily.
+##
+
+import functools
+
+
+class Barrett:
+    """
+    Barrett reduction modulo p: x mod p for 0 <= x < p^2 as
+    x - floor(x * mu / 4^k) * p, with mu = floor(4^k / p) precomputed.
+    """
+    def __init__(self, p):
+        self.p = p
+        self.k = p.bit_length()
+        self.shift = 2 * self.k
+        self.mu = (1 << self.shift) // p
+
+    def reduce(self, x):
+        """ x mod p, for 0 <= x < p^2. """
+        r = x - ((x * self.mu) >> self.shift) * self.p
+        # The quotient estimate is at most 2 too small
+        while r >= self.p:
+            r -= self.p
+        return r
+
+    def mul(self, a, b):
+        """ a * b mod p, for 0 <= a, b < p. """
+        return self.reduce(a * b)
+
+
+class Montgomery:
+    """
+    Montgomery arithmetic modulo an odd prime p, with R = 2^k, k = bitlength(p).
+    Values passed to mul/redc are in Montgomery form a*R mod p; use to_mont
+    and from_mont at the boundaries.
+    """
+    def __init__(self, p):
+        if p % 2 == 0:
+            raise ValueError("Montgomery reduction needs an odd modulus")
+        self.p = p
+        self.k = p.bit_length()
+        self.mask = (1 << self.k) - 1
+        # p * p_neg_inv = -1 (mod R)
+        self.p_neg_inv = (-pow(p, -1, 1 << self.k)) & self.mask
+        self.r2 = pow(1 << self.k, 2, p)
+
+    def redc(self, t):
+        """ t * R^-1 mod p, for 0 <= t < p * R. """
+        m = ((t & self.mask) * self.p_neg_inv) & self.mask
+        u = (t + m * self.p) >> self.k
+        return u - self.p if u >= self.p else u
+
+    def mul(self, a, b):
+        """ Product of two Montgomery-form values, in Montgomery form. """
+        return self.redc(a * b)
+
+    def to_mont(self, a):
+        return self.redc((a % self.p) * self.r2)
+
+    def from_mont(self, a):
+        return self.redc(a)
+
+    def pow(self, a, e):
+        """ a^e for Montgomery-form a, staying in Montgomery form throughout. """
+        result = self.to_mont(1)
+        while e > 0:
+            if e & 1:
+                result = self.redc(result * a)
+            a = self.redc(a * a)
+            e >>= 1
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def get_barrett(p):
+    """ Cached Barrett context for modulus p. """
+    return Barrett(p)
+
+
+@functools.lru_cache(maxsize=None)
+def get_montgomery(p):
+    """ Cached Montgomery context for odd modulus p. """
+    return Montgomery(p)
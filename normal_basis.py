@@ -0,0 +1,168 @@
+##
+# Normal-basis representation of Z_p[X]/(h), h irreducible of degree n.
+#
+# A normal element alpha is one whose conjugates alpha, alpha^p, ...,
+# alpha^(p^(n-1)) form a basis over Z/pZ. In that basis an element is a
+# coordinate vector v (f = sum v[i] * alpha^(p^i)), and the Frobenius map
+# f -> f^p is a cyclic shift of v, so p-th powers cost nothing.
+#
+# Products can use the Massey-Omura formula with the multiplication matrix
+# M, where M[i][j] is the alpha-coordinate of alpha^(p^i) * alpha^(p^j):
+#   (u * v)[k] = sum over i, j of u[i + k] * v[j + k] * M[i][j]
+# (indices mod n). That costs n * nnz(M), which is only O(n^2) when M has
+# O(n) nonzero entries, as for an optimal normal basis (2n - 1 of them); in
+# general nnz(M) is about n^2. A few normal elements are tried so that the
+# sparsest M is kept, and if it is still denser than 2n - 1 entries products
+# go through the polynomial basis instead (two basis changes and one
+# finite_field_multiply, all O(n^2)). Either way p-th powers stay free.
+##
+
+import poly_arithmetic as pa
+import finite_field_arithmetic as ffa
+import linear_algebra as la
+
+
+class NormalBasis:
+    """
+    Normal basis of Z_p[X]/(h) with conversion to and from the polynomial
+    basis, Frobenius shifts, multiplication and exponentiation.
+
+    Args:
+        h: irreducible modulus polynomial
+        rng: random.Random instance or seed for the search of normal elements
+        candidates: number of normal elements to try; the one with the
+                    sparsest multiplication matrix is kept
+    """
+    def __init__(self, h, rng=None, candidates=4):
+        self.h = h
+        self.p = h.mod
+        self.n = h.degree()
+        rng = pa.resolve_rng(rng)
+
+        best = None
+        found = 0
+        while found < candidates:
+            alpha = ffa.generate_polynomial_h(h, rng)
+            conjugates = self._conjugates(alpha)
+            # Columns are the conjugates; normal iff the matrix is invertible
+            columns = [la.coefficient_vector(c, self.n) for c in conjugates]
+            basis = [list(row) for row in zip(*columns)]
+            try:
+                inverse = la.matrix_inverse(basis, self.p)
+            except ValueError:
+                continue
+            found += 1
+            terms = self._multiplication_terms(conjugates, inverse)
+            if best is None or len(terms) < len(best[3]):
+                best = (alpha, basis, inverse, terms)
+
+        self.alpha, self.matrix, self.inverse_matrix, self.terms = best
+        # Massey-Omura only pays off for an optimal (or equally sparse) basis
+        self.massey_omura = len(self.terms) <= 2 * self.n - 1
+        self._one = self.to_normal(pa.Polynomial.one(self.p))
+
+    def _conjugates(self, alpha):
+        """ alpha, alpha^p, ..., alpha^(p^(n-1)) in the polynomial basis. """
+        conjugates = [alpha]
+        for _ in range(self.n - 1):
+            conjugates.append(ffa.power_mod(conjugates[-1], self.p, self.h))
+        return conjugates
+
+    def _multiplication_terms(self, conjugates, inverse):
+        """
+        Nonzero entries (i, j, M[i][j]) of the Massey-Omura matrix. With
+        T[d] the normal coordinates of alpha * alpha^(p^d), applying the
+        Frobenius gives M[i][j] = T[(j - i) mod n][(-i) mod n], so only n
+        field multiplications are needed.
+        """
+        n = self.n
+        T = [la.matrix_vector(inverse, la.coefficient_vector(
+                 ffa.finite_field_multiply(conjugates[0], c, self.h), n), self.p)
+             for c in conjugates]
+        terms = []
+        for i in range(n):
+            for j in range(n):
+                value = T[(j - i) % n][(-i) % n]
+                if value != 0:
+                    terms.append((i, j, value))
+        return terms
+
+    # --- Conversion ---
+
+    def to_normal(self, f):
+        """ Normal-basis coordinates of f (given in the polynomial basis). """
+        f = ffa.poly_mod_reduction(f, self.h)
+        return la.matrix_vector(self.inverse_matrix, la.coefficient_vector(f, self.n), self.p)
+
+    def from_normal(self, v):
+        """ Polynomial-basis element with normal-basis coordinates v. """
+        return pa.Polynomial(la.matrix_vector(self.matrix, v, self.p), self.p)
+
+    # --- Arithmetic on coordinate vectors ---
+
+    def frobenius(self, v, k=1):
+        """ v^(p^k): a cyclic shift of the coordinates by k. """
+        k %= self.n
+        return v[-k:] + v[:-k] if k else list(v)
+
+    def multiply(self, u, v):
+        """
+        Product of two elements in normal-basis coordinates: Massey-Omura if
+        the multiplication matrix is sparse enough, otherwise through the
+        polynomial basis.
+        """
+        if not self.massey_omura:
+            return self.to_normal(ffa.finite_field_multiply(
+                self.from_normal(u), self.from_normal(v), self.h))
+        n, p = self.n, self.p
+        result = [0] * n
+        for k in range(n):
+            total = 0
+            for i, j, value in self.terms:
+                total += u[(i + k) % n] * v[(j + k) % n] * value
+            result[k] = total % p
+        return result
+
+    def one(self):
+        """ Coordinates of 1. """
+        return list(self._one)
+
+    def power(self, v, e):
+        """
+        v^e in normal-basis coordinates. The exponent is processed in base p
+        from the top digit down: result = result^p * v^digit, where the p-th
+        power is a free shift and each distinct v^digit is computed once.
+        Without Massey-Omura the v^digit are kept in the polynomial basis, so
+        that every step needs only two basis changes.
+        """
+        digits = []
+        while e > 0:
+            digits.append(e % self.p)
+            e //= self.p
+        if self.massey_omura:
+            small_power = lambda d: self._small_power(v, d)
+            times = self.multiply
+        else:
+            w = self.from_normal(v)
+            small_power = lambda d: ffa.power_mod(w, d, self.h)
+            times = lambda u, x: self.to_normal(
+                ffa.finite_field_multiply(self.from_normal(u), x, self.h))
+        powers = {}
+        result = self.one()
+        for d in reversed(digits):
+            result = self.frobenius(result)
+            if d:
+                if d not in powers:
+                    powers[d] = small_power(d)
+                result = times(result, powers[d])
+        return result
+
+    def _small_power(self, v, d):
+        result, base = None, v
+        while d > 0:
+            if d % 2 == 1:
+                result = base if result is None else self.multiply(result, base)
+            d //= 2
+            if d:
+                base = self.multiply(base, base)
+        return result
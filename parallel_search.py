@@ -0,0 +1,73 @@
+##
+# Parallel random search over a process pool, used by the generators
+# (pa.poly_generate_irreducible, ffa.primitive_generation) when they are
+# given workers > 1.
+#
+# A search is described by an attempt function attempt(*args, rng) that
+# samples one candidate and returns it if it passes the test, or None. Every
+# task runs up to `batch` attempts from its own random.Random, seeded from
+# the caller's rng, so the streams are independent. The first success wins;
+# queued tasks are cancelled and running ones see the shared stop event and
+# return after their current attempt. Which task finishes first depends on
+# timing, so unlike the sequential search a seed does not fix the result,
+# only the streams. first_success returns without waiting for the attempts
+# still running.
+##
+
+import concurrent.futures
+import multiprocessing
+import random
+
+# Attempts per task before the worker reports back
+BATCH = 16
+
+_stop = None
+
+
+def _init_worker(stop):
+    global _stop
+    _stop = stop
+
+
+def _search(attempt, args, seed, batch):
+    rng = random.Random(seed)
+    for _ in range(batch):
+        if _stop.is_set():
+            return None
+        result = attempt(*args, rng)
+        if result is not None:
+            return result
+    return None
+
+
+def first_success(attempt, args, rng, workers, batch=BATCH):
+    """
+    Runs attempt(*args, rng) on `workers` processes until one succeeds and
+    returns that result. attempt must be a module-level function (it is sent
+    to the workers by reference); rng provides the seeds of the streams.
+
+    Cancellation is cooperative: queued tasks are dropped, but a running
+    attempt cannot be interrupted. The call returns as soon as a result is
+    in, without waiting for them; the workers check the stop event before
+    their next attempt and exit in the background.
+    """
+    stop = multiprocessing.Event()
+    pool = concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                  initargs=(stop,))
+
+    def submit():
+        return pool.submit(_search, attempt, args, rng.getrandbits(64), batch)
+
+    try:
+        pending = {submit() for _ in range(workers)}
+        while True:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    return result
+                pending.add(submit())
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,5 +1,9 @@
 # Finally finished
 import random
+import heapq
+import types
+import instrumentation as instr
+import parallel_search
 
 class Polynomial:
     """ 
@@ -14,7 +18,17 @@ class Polynomial:
     All the modulo prime p operations are applied stepwise, to maintain
     the form-appropriate form.
     
+    Polynomials are immutable (attributes cannot be reassigned), compare
+    structurally and are hashable, so they can be used as dict keys and
+    cache keys. Zero, one and X are interned per modulus, see
+    Polynomial.zero/one/x. The coefficients stay a plain list for speed
+    (list subclasses or tuples are slower to index in the hot loops, and
+    tuples would not compare equal to lists); treat it as read-only and copy
+    it before changing anything, since instances are shared.
+    
     """
+    __slots__ = ("mod", "coefficients", "_hash")
+    
     def __init__ (self, coefficients, mod):
         """
         
@@ -27,7 +41,8 @@ class Polynomial:
                                       described in class docstring.
             mod (int): Prime p (for some Z/pZ) 
         """
-        self.mod = mod # It's just an integer this time :-)
+        if instr.enabled:
+            instr.count("constructions")
         
         # Simply use the built-in modulo function to make sure moduli appropriate,
         # then trim leading zeroes (also for input robustness, didn't have time last time.)
@@ -35,10 +50,55 @@ class Polynomial:
         
         while len(temp_coeffs) > 1 and temp_coeffs[-1] == 0:
             temp_coeffs.pop()
-        if len(temp_coeffs) == 1 and temp_coeffs[0] == 0:
-            self.coefficients = [0]
-        else:
-            self.coefficients = temp_coeffs
+        if not temp_coeffs:
+            temp_coeffs = [0]
+        # __setattr__ is blocked, so the slots are filled through their
+        # descriptors (much cheaper than object.__setattr__)
+        _set_mod(self, mod) # It's just an integer this time :-)
+        _set_coefficients(self, temp_coeffs)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Polynomial is immutable")
+    
+    __delattr__ = __setattr__
+    
+    def __eq__(self, other):
+        """ Structural equality: same modulus and same canonical coefficients. """
+        if isinstance(other, Polynomial):
+            return self.mod == other.mod and self.coefficients == other.coefficients
+        return NotImplemented
+    
+    def __hash__(self):
+        # Hashed over the nonzero terms, like SparsePolynomial, so that equal
+        # dense and sparse polynomials hash alike; computed once
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash((self.mod,
+                          tuple((e, c) for e, c in enumerate(self.coefficients) if c != 0)))
+            _set_hash(self, value)
+            return value
+    
+    def __repr__(self):
+        return "Polynomial(%r, %r)" % (list(self.coefficients), self.mod)
+    
+    def __reduce__(self):
+        return (Polynomial, (list(self.coefficients), self.mod))
+    
+    @classmethod
+    def zero(cls, mod):
+        """ The interned zero polynomial over Z/modZ. """
+        return _interned(mod)[0]
+    
+    @classmethod
+    def one(cls, mod):
+        """ The interned constant 1 over Z/modZ. """
+        return _interned(mod)[1]
+    
+    @classmethod
+    def x(cls, mod):
+        """ The interned polynomial X over Z/modZ. """
+        return _interned(mod)[2]
             
     def degree(self):
         """
@@ -75,15 +135,20 @@ class Polynomial:
                 other_poly: second polynomial to be used
         
         """
-        # Note that 
-        max_len = max(len(self.coefficients), len(other_poly.coefficients))
-        new_coeffs = []
+        # Mixed with a sparse operand: let SparsePolynomial.__radd__ handle it
+        if isinstance(other_poly, SparsePolynomial):
+            return NotImplemented
         
-        # Incredibly simple incrementation of coefficients, since we're dealing with
-        # integer operations. And we don't have to do any inversions...
-        for i in range(max_len):
-            new_coeff = (self.get_coefficient(i) + other_poly.get_coefficient(i)) % self.mod
-            new_coeffs.append(new_coeff)
+        # Sum without reducing: __init__ reduces every coefficient mod p once
+        # anyway, so doing it here as well would double the divisions.
+        if len(self.coefficients) >= len(other_poly.coefficients):
+            new_coeffs = list(self.coefficients)
+            for i, c in enumerate(other_poly.coefficients):
+                new_coeffs[i] += c
+        else:
+            new_coeffs = list(other_poly.coefficients)
+            for i, c in enumerate(self.coefficients):
+                new_coeffs[i] += c
         
         # As I mentioned previously, the modulo operations are applied at the conclusion
         # of all basic operations to maintain conformity to p.
@@ -102,12 +167,15 @@ class Polynomial:
                 self: base polynomial for addition
                 other_poly: second polynomial to be used
         """
+        if isinstance(other_poly, SparsePolynomial):
+            return NotImplemented
+        
         max_len = max(len(self.coefficients), len(other_poly.coefficients))
-        new_coeffs = []
+        new_coeffs = list(self.coefficients) + [0] * (max_len - len(self.coefficients))
         
-        for i in range(max_len):
-            new_coeff = (self.get_coefficient(i) - other_poly.get_coefficient(i)) % self.mod
-            new_coeffs.append(new_coeff)
+        # Reduced once, in __init__ (see __add__)
+        for i, c in enumerate(other_poly.coefficients):
+            new_coeffs[i] -= c
             
         return Polynomial(new_coeffs, self.mod)
     
@@ -116,33 +184,250 @@ class Polynomial:
             Performs polynomial multiplication: (self * other) mod p.
             
         """
+        if isinstance(other, SparsePolynomial):
+            return NotImplemented
+        
         deg_self = self.degree()
         deg_other = other.degree()
         
         if deg_self == -1 or deg_other == -1:
-            return Polynomial([0], self.mod)
+            return Polynomial.zero(self.mod)
 
         new_deg = deg_self + deg_other
         new_coeffs = [0] * (new_deg + 1)
+        if instr.enabled:
+            instr.count("coefficient_multiplies",
+                        len(self.coefficients) * len(other.coefficients))
         
         # Whereas the logic above simply fetches the necessary data and increments
         # the appropriate lists to reflect the new polynomial, this handles the
         # incrementation of the coefficients.
         
-        for i in range(len(self.coefficients)):
-            for j in range(len(other.coefficients)):
-                new_coeffs[i + j] = (new_coeffs[i + j] 
-                                     + self.coefficients[i] 
-                                     * other.coefficients[j]) % self.mod
+        # The partial sums are left unreduced (Python ints don't overflow), so
+        # every output coefficient costs one modulo in __init__ instead of one
+        # per term - for big p each of those is a multi-word division.
+        other_coeffs = other.coefficients
+        for i, a in enumerate(self.coefficients):
+            if a == 0:
+                continue
+            for j, b in enumerate(other_coeffs):
+                new_coeffs[i + j] += a * b
                 
         return Polynomial(new_coeffs, self.mod)
     
+_set_mod = Polynomial.mod.__set__
+_set_coefficients = Polynomial.coefficients.__set__
+_set_hash = Polynomial._hash.__set__
+
+# Interned (zero, one, X) per modulus. Polynomials are immutable, so these
+# can be handed out to every caller instead of allocating new ones.
+_constants = {}
+
+def _interned(mod):
+    constants = _constants.get(mod)
+    if constants is None:
+        constants = (Polynomial([0], mod), Polynomial([1], mod), Polynomial([0, 1], mod))
+        _constants[mod] = constants
+    return constants
+
+# --- Sparse representation ---
+# A polynomial like X^100000 + X + 1 would be a 100001-entry list above. The
+# sparse class stores only the nonzero terms as {exponent: coefficient}, and
+# make_polynomial/make_polynomial_from_terms pick the representation from the
+# fill ratio. Both classes produce the same canonical coefficients, and the
+# dense one defers to the sparse one in mixed operations.
+
+# A polynomial of degree >= SPARSE_MIN_DEGREE is stored sparse if less than
+# SPARSE_FILL_RATIO of its coefficients are nonzero.
+SPARSE_MIN_DEGREE = 256
+SPARSE_FILL_RATIO = 0.05
+
+class SparsePolynomial:
+    """
+    Polynomial in Z[X]/pZ stored as {exponent: coefficient} with only the
+    nonzero coefficients (each in [0, p)). Offers the same interface as
+    Polynomial (mod, degree, get_coefficient, coefficients, +, -, *), where
+    coefficients is the dense canonical list, built on demand. Immutable and
+    hashable like Polynomial: terms is a read-only mapping, and the dense
+    list and the hash are computed once.
+    """
+    __slots__ = ("mod", "terms", "_degree", "_dense", "_hash")
+    
+    def __init__(self, terms, mod):
+        """
+        Args:
+            terms (dict[int, int]): exponent -> coefficient, in any form
+                                    (coefficients are reduced, zeros dropped);
+                                    exponents must be >= 0 (else ValueError)
+            mod (int): Prime p (for some Z/pZ)
+        """
+        if instr.enabled:
+            instr.count("constructions")
+        reduced = {}
+        for e, c in terms.items():
+            if e < 0:
+                raise ValueError("negative exponent %d" % e)
+            c %= mod
+            if c != 0:
+                reduced[e] = c
+        _sparse_set_mod(self, mod)
+        _sparse_set_terms(self, types.MappingProxyType(reduced))
+        _sparse_set_degree(self, max(reduced) if reduced else -1)
+        _sparse_set_dense(self, None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("SparsePolynomial is immutable")
+    
+    __delattr__ = __setattr__
+    
+    def __repr__(self):
+        return "SparsePolynomial(%r, %r)" % (dict(self.terms), self.mod)
+    
+    def __reduce__(self):
+        return (SparsePolynomial, (dict(self.terms), self.mod))
+    
+    def degree(self):
+        """ Degree, with -1 for the zero polynomial (as in Polynomial). """
+        return self._degree
+    
+    def get_coefficient(self, index):
+        return self.terms.get(index, 0)
+    
+    @property
+    def coefficients(self):
+        """ Dense coefficient list, identical to that of the equal Polynomial. """
+        if self._dense is None:
+            dense = [0] * (self._degree + 1) if self.terms else [0]
+            for e, c in self.terms.items():
+                dense[e] = c
+            _sparse_set_dense(self, dense)
+        return self._dense
+    
+    def __eq__(self, other):
+        if isinstance(other, (Polynomial, SparsePolynomial)):
+            return self.mod == other.mod and self.terms == _terms_of(other)
+        return NotImplemented
+    
+    def __hash__(self):
+        # Same value as Polynomial.__hash__ for equal polynomials; computed once
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash((self.mod, tuple(sorted(self.terms.items()))))
+            _sparse_set_hash(self, value)
+            return value
+    
+    def __add__(self, other):
+        terms = dict(self.terms)
+        for e, c in _terms_of(other).items():
+            terms[e] = terms.get(e, 0) + c
+        return make_polynomial_from_terms(terms, self.mod)
+    
+    __radd__ = __add__
+    
+    def __sub__(self, other):
+        terms = dict(self.terms)
+        for e, c in _terms_of(other).items():
+            terms[e] = terms.get(e, 0) - c
+        return make_polynomial_from_terms(terms, self.mod)
+    
+    def __rsub__(self, other):
+        terms = dict(_terms_of(other))
+        for e, c in self.terms.items():
+            terms[e] = terms.get(e, 0) - c
+        return make_polynomial_from_terms(terms, self.mod)
+    
+    def __mul__(self, other):
+        other_terms = _terms_of(other)
+        if instr.enabled:
+            instr.count("coefficient_multiplies", len(self.terms) * len(other_terms))
+        # Unreduced accumulation, reduced once in the constructor
+        terms = {}
+        for e1, c1 in self.terms.items():
+            for e2, c2 in other_terms.items():
+                terms[e1 + e2] = terms.get(e1 + e2, 0) + c1 * c2
+        return make_polynomial_from_terms(terms, self.mod)
+    
+    __rmul__ = __mul__
+
+_sparse_set_mod = SparsePolynomial.mod.__set__
+_sparse_set_terms = SparsePolynomial.terms.__set__
+_sparse_set_degree = SparsePolynomial._degree.__set__
+_sparse_set_dense = SparsePolynomial._dense.__set__
+_sparse_set_hash = SparsePolynomial._hash.__set__
+
+def _terms_of(f):
+    """ {exponent: coefficient} of the nonzero terms of a dense or sparse f. """
+    if isinstance(f, SparsePolynomial):
+        return f.terms
+    return {e: c for e, c in enumerate(f.coefficients) if c != 0}
+
+def _prefers_sparse(degree, nonzero):
+    return degree >= SPARSE_MIN_DEGREE and nonzero < SPARSE_FILL_RATIO * (degree + 1)
+
+def make_polynomial(coefficients, mod):
+    """
+    Builds a Polynomial or SparsePolynomial from a dense coefficient list,
+    depending on how many of the coefficients are nonzero.
+    """
+    reduced = [c % mod for c in coefficients]
+    nonzero = {e: c for e, c in enumerate(reduced) if c != 0}
+    degree = max(nonzero) if nonzero else -1
+    if _prefers_sparse(degree, len(nonzero)):
+        return SparsePolynomial(nonzero, mod)
+    return Polynomial(reduced, mod)
+
+def make_polynomial_from_terms(terms, mod):
+    """
+    Builds a Polynomial or SparsePolynomial from {exponent: coefficient},
+    depending on the fill ratio.
+    """
+    sparse = SparsePolynomial(terms, mod)
+    if _prefers_sparse(sparse.degree(), len(sparse.terms)):
+        return sparse
+    return Polynomial(sparse.coefficients, mod)
+
+def _sparse_LD(f, g):
+    """
+    Long division f / g where f or g is sparse. The remainder is kept as a
+    dict with a max-heap of its exponents, so every step costs one term of g
+    per nonzero term instead of a pass over the whole dense remainder.
+    """
+    p = f.mod
+    deg_g = g.degree()
+    g_terms = _terms_of(g)
+    lead_inv = pow(g_terms[deg_g], p - 2, p)
+    lower = [(e, c) for e, c in g_terms.items() if e != deg_g]
+    
+    r = dict(_terms_of(f))
+    heap = [-e for e in r]
+    heapq.heapify(heap)
+    q = {}
+    while heap and -heap[0] >= deg_g:
+        e = -heapq.heappop(heap)
+        c = r.pop(e) % p
+        if c == 0:
+            continue
+        t = c * lead_inv % p
+        shift = e - deg_g
+        q[shift] = t
+        # r = r - t * X^shift * g; new exponents are all below e
+        for ge, gc in lower:
+            k = ge + shift
+            if k in r:
+                r[k] -= t * gc
+            else:
+                r[k] = -t * gc
+                heapq.heappush(heap, -k)
+    return make_polynomial_from_terms(q, p), make_polynomial_from_terms(r, p)
+
 # The rest of the logic is handled as a regular function, though named in a manner
 # less obnoxious than in the standard arithmetics implementation, and uses all of the
 # (basic) functions given above.
 # [NOTE]: This also removes the issue of having to call every single function on the 
 # polynomial function we are working with itself, which was... a choice.
 
+@instr.timed
 def polynomial_LD(f, g):
     """
     
@@ -154,35 +439,49 @@ def polynomial_LD(f, g):
     """
     
     p = f.mod
-    q = Polynomial([0], p)
-    r = Polynomial(f.coefficients, p)
+    if instr.enabled:
+        instr.count("divisions")
+
+    deg_g = g.degree()
+    if deg_g == -1:
+        raise ZeroDivisionError("polynomial division by zero")
+    if isinstance(f, SparsePolynomial) or isinstance(g, SparsePolynomial):
+        return _sparse_LD(f, g)
+    deg_f = f.degree()
+    if deg_f < deg_g:
+        return Polynomial.zero(p), f
     
     # Calculate modular inverse of the leading coefficient of g
-    g_lead_coeff = g.coefficients[-1]
+    g_coeffs = g.coefficients
+    g_lead_coeff = g_coeffs[-1]
     # Use pow(base, exponent, modulus) for modular inverse
     # exponent = -1 in Z_p is p-2 by Fermat's Little Theorem
     g_lead_coeff_inv = pow(g_lead_coeff, p - 2, p)
     
-    while r.degree() >= g.degree() and r.degree() != -1:
-        deg_r = r.degree()
-        r_lead_coeff = r.coefficients[-1]
+    # Work on a plain list instead of building term and term * g polynomials
+    # every step (which made the division cubic). Only the current leading
+    # coefficient of r has to be exact, so the rest of r is kept unreduced
+    # and reduced once at the end.
+    r = list(f.coefficients)
+    q = [0] * (deg_f - deg_g + 1)
+    
+    for term_degree in range(deg_f - deg_g, -1, -1):
+        r_lead_coeff = r[term_degree + deg_g] % p
+        if r_lead_coeff == 0:
+            continue
         
-        # Calculate the coefficient and degree of the term to subtract
+        # Calculate the coefficient of the term (term_coeff) * X^(term_degree)
         term_coeff = (r_lead_coeff * g_lead_coeff_inv) % p
-        term_degree = deg_r - g.degree()
+        q[term_degree] = term_coeff
         
-        # Create the term as a polynomial: (term_coeff) * X^(term_degree)
-        term_coeffs = [0] * (term_degree + 1)
-        term_coeffs[term_degree] = term_coeff
-        term = Polynomial(term_coeffs, p)
+        # r = r - (term * g); the leading coefficient cancels exactly
+        for j in range(deg_g):
+            r[term_degree + j] -= term_coeff * g_coeffs[j]
+        r[term_degree + deg_g] = 0
         
-        # q = q + term
-        # r = r - (term * g)
-        q = q + term
-        r = r - (term * g)
-        
-    return q, r
+    return Polynomial(q, p), Polynomial(r[:deg_g] or [0], p)
 
+@instr.timed
 def poly_extended_euclidean_algorithm(f, g):
     """
     Performs the Extended Euclidean Algorithm for polynomials f and g.
@@ -198,7 +497,7 @@ def poly_extended_euclidean_algorithm(f, g):
     
     if g.degree() == -1:
         if f.degree() == -1: # Both are zero
-            return Polynomial([0], p), Polynomial([0], p), Polynomial([0], p)
+            return Polynomial.zero(p), Polynomial.zero(p), Polynomial.zero(p)
         
         # For now, 
         lead_coeff = f.coefficients[-1]
@@ -207,12 +506,12 @@ def poly_extended_euclidean_algorithm(f, g):
         
         d = f * inv_poly
         a = inv_poly
-        b = Polynomial([0], p)
+        b = Polynomial.zero(p)
         return a, b, d
 
     r_prev, r_curr = f, g
-    a_prev, a_curr = Polynomial([1], p), Polynomial([0], p)
-    b_prev, b_curr = Polynomial([0], p), Polynomial([1], p)
+    a_prev, a_curr = Polynomial.one(p), Polynomial.zero(p)
+    b_prev, b_curr = Polynomial.zero(p), Polynomial.one(p)
 
     while r_curr.degree() != -1:
         q, r_next = polynomial_LD(r_prev, r_curr)
@@ -245,6 +544,87 @@ def poly_extended_euclidean_algorithm(f, g):
     
     return a_monic, b_monic, d_monic
 
+# gcd-only variants of the algorithm above. They work on plain coefficient
+# lists (ascending, no trailing zeros, [] for zero) and reduce the remainder
+# in place, instead of building new Polynomials for every q, r, a and b.
+
+def _trimmed(coeffs):
+    coeffs = list(coeffs)
+    while coeffs and coeffs[-1] == 0:
+        coeffs.pop()
+    return coeffs
+
+def _divmod_in_place(r, g, p):
+    """
+    Reduces r modulo g in place (r becomes the remainder) and returns the
+    quotient as a list. g must be nonzero.
+    """
+    deg_g = len(g) - 1
+    lead_inv = pow(g[-1], p - 2, p)
+    q = [0] * max(len(r) - deg_g, 0)
+    while len(r) > deg_g:
+        c = r[-1] * lead_inv % p
+        shift = len(r) - 1 - deg_g
+        q[shift] = c
+        for j in range(deg_g):
+            r[shift + j] = (r[shift + j] - c * g[j]) % p
+        r.pop()
+        while r and r[-1] == 0:
+            r.pop()
+    return q
+
+def poly_gcd(f, g):
+    """
+    Monic gcd(f, g), without the cofactors a and b of the extended Euclidean
+    algorithm (so without the two extra multiplications per round).
+    """
+    p = f.mod
+    r_prev, r_curr = _trimmed(f.coefficients), _trimmed(g.coefficients)
+    while r_curr:
+        _divmod_in_place(r_prev, r_curr, p)
+        r_prev, r_curr = r_curr, r_prev
+    if not r_prev:
+        return Polynomial.zero(p)
+    lead_inv = pow(r_prev[-1], p - 2, p)
+    return Polynomial([c * lead_inv for c in r_prev], p)
+
+def poly_half_extended_euclidean(f, g):
+    """
+    Returns (a, d) with d = gcd(f, g) monic and a*f = d (mod g), i.e. the
+    extended Euclidean algorithm tracking only the cofactor of f. This is
+    all that is needed for inverses modulo g.
+    """
+    p = f.mod
+    r_prev, r_curr = _trimmed(f.coefficients), _trimmed(g.coefficients)
+    a_prev, a_curr = [1], []
+    while r_curr:
+        q = _divmod_in_place(r_prev, r_curr, p)
+        r_prev, r_curr = r_curr, r_prev
+        # a_next = a_prev - q * a_curr
+        a_next = a_prev + [0] * max(len(q) + len(a_curr) - 1 - len(a_prev), 0)
+        for i, x in enumerate(q):
+            if x == 0:
+                continue
+            for j, y in enumerate(a_curr):
+                a_next[i + j] -= x * y
+        a_prev, a_curr = a_curr, _trimmed([c % p for c in a_next])
+    if not r_prev:
+        return Polynomial.zero(p), Polynomial.zero(p)
+    lead_inv = pow(r_prev[-1], p - 2, p)
+    return (Polynomial([c * lead_inv for c in a_prev] or [0], p),
+            Polynomial([c * lead_inv for c in r_prev], p))
+
+def poly_is_squarefree(f):
+    """
+    True if f has no repeated factors, i.e. gcd(f, f') = 1. (In
+    characteristic p, f' = 0 means f is a p-th power, so not squarefree
+    unless it is constant.)
+    """
+    if f.degree() <= 0:
+        return True
+    return poly_gcd(f, _derivative(f)).degree() == 0
+
+@instr.timed
 def poly_irreducibility_check(f):
     """
     Checks if a polynomial f is irreducible in Z_p[X].
@@ -290,20 +670,188 @@ def poly_irreducibility_check(f):
     # The polynomial is irreducible if no divisors are found up to degree n/2, so:
     return True
 
-def poly_generate_irreducible(p, n):
+def resolve_rng(rng=None):
+    """
+    Turns the rng argument of the generation functions into something with
+    a randint method. None falls back to the global random module (the old
+    behaviour), an integer is used as the seed of a fresh random.Random, and
+    anything else (a random.Random instance) is passed through unchanged.
+
+    Resolve once at the top-level call and pass the result further down, so
+    that all the sampling of one task draws from the same stream.
+    """
+    if rng is None:
+        return random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    return rng
+
+def _irreducible_candidate(p, n, rng):
+    """ One random monic polynomial of degree n, if it is irreducible, else None. """
+    # Generate a random polynomial of the given degree n:
+    coeffs = [0] * (n + 1)
+    for i in range(n):
+        coeffs[i] = rng.randint(0, p - 1)
+    coeffs[n] = 1 # Again, make it monic
+    
+    f = Polynomial(coeffs, p)
+    return f if poly_irreducibility_check(f) else None
+
+@instr.timed
+def poly_generate_irreducible(p, n, rng=None, workers=None):
     """
     Generates a random irreducible polynomial of degree n in Z/pZ.
     This is as simple as sampling a random polynomial in the given range,
     and using the previous
+
+    Args:
+        p (int): Prime modulus.
+        n (int): Degree of the polynomial to generate.
+        rng: Optional random.Random instance or integer seed, see resolve_rng.
+        workers (int): Optional number of processes to test candidates on in
+                       parallel, see parallel_search.
     """
+    rng = resolve_rng(rng)
+    if workers is not None and workers > 1:
+        return parallel_search.first_success(_irreducible_candidate, (p, n), rng, workers)
     while True:
-        # Generate a random polynomial of the given degree n:
-        coeffs = [0] * (n + 1)
-        for i in range(n):
-            coeffs[i] = random.randint(0, p - 1)
-        coeffs[n] = 1 # Again, make it monic
-        
-        f = Polynomial(coeffs, p)
-        
-        if poly_irreducibility_check(f):
+        f = _irreducible_candidate(p, n, rng)
+        if f is not None:
             return f
+
+def poly_resultant(f, g):
+    """
+    Resultant Res(f, g) in Z/pZ, computed with the Euclidean algorithm:
+    Res(f, g) = (-1)^(deg f * deg g) * lc(g)^(deg f - deg r) * Res(g, r),
+    where r = f mod g, down to a constant g, for which Res(f, g) = g^deg(f).
+    Zero if f or g is the zero polynomial or if they share a factor.
+    """
+    p = f.mod
+    if f.degree() == -1 or g.degree() == -1:
+        return 0
+    result = 1
+    while g.degree() > 0:
+        r = polynomial_LD(f, g)[1]
+        if r.degree() == -1:
+            return 0
+        deg_f, deg_g = f.degree(), g.degree()
+        if deg_f * deg_g % 2 == 1:
+            result = -result
+        result = result * pow(g.coefficients[-1], deg_f - r.degree(), p) % p
+        f, g = g, r
+    return result * pow(g.coefficients[0], f.degree(), p) % p
+
+# --- Evaluation and interpolation ---
+# Below these numbers of points, evaluate_many/interpolate use the direct
+# quadratic methods (Horner, Newton) instead of the subproduct tree. With the
+# schoolbook multiplication above, the tree only beats Horner for very many
+# points, while it beats Newton's method early (measured at p = 2^61 - 1).
+EVALUATE_TREE_THRESHOLD = 2048
+INTERPOLATE_TREE_THRESHOLD = 64
+
+def poly_evaluate(f, a):
+    """
+    Evaluates f at the point a in Z/pZ, using Horner's rule.
+    """
+    p = f.mod
+    result = 0
+    for c in reversed(f.coefficients):
+        result = (result * a + c) % p
+    return result
+
+def subproduct_tree(points, p):
+    """
+    Builds the subproduct tree of the points: level 0 holds the linear factors
+    (X - a_i), and every node of the next level is the product of two
+    neighbouring nodes (an odd one out is carried up as is). The last level
+    holds the single product of all (X - a_i).
+
+    Returns the list of levels.
+    """
+    level = [Polynomial([-a, 1], p) for a in points]
+    tree = [level]
+    while len(level) > 1:
+        next_level = [level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2 == 1:
+            next_level.append(level[-1])
+        tree.append(next_level)
+        level = next_level
+    return tree
+
+def _remainders_down(f, tree):
+    """
+    Reduces f modulo every node of the tree, from the root down, and returns
+    the remainders at the leaves, i.e. the constants f(a_i).
+    """
+    remainders = [polynomial_LD(f, tree[-1][0])[1]]
+    for depth in range(len(tree) - 2, -1, -1):
+        level = tree[depth]
+        next_remainders = []
+        for i, r in enumerate(remainders):
+            # Node i of the level above has children 2i and (if present) 2i + 1
+            for child in level[2 * i:2 * i + 2]:
+                next_remainders.append(polynomial_LD(r, child)[1])
+        remainders = next_remainders
+    return [r.coefficients[0] for r in remainders]
+
+def evaluate_many(f, points):
+    """
+    Evaluates f at every point in points (integers mod p), returning the list
+    of values. For many points the subproduct tree is used: f is reduced
+    modulo the product of all (X - a_i) and then down the tree, so that the
+    remainders at the leaves are the values f(a_i).
+    """
+    p = f.mod
+    points = [a % p for a in points]
+    if len(points) < EVALUATE_TREE_THRESHOLD:
+        return [poly_evaluate(f, a) for a in points]
+    return _remainders_down(f, subproduct_tree(points, p))
+
+def _derivative(f):
+    """ Formal derivative of f. """
+    return Polynomial([i * c for i, c in enumerate(f.coefficients)][1:] or [0], f.mod)
+
+def interpolate(points, values, p):
+    """
+    Returns the unique polynomial f of degree < len(points) over Z/pZ with
+    f(points[i]) = values[i]. The points must be distinct mod p.
+
+    Uses Lagrange interpolation: with M the product of all (X - a_i),
+    f = sum of values[i] / M'(a_i) * M / (X - a_i). For many points M' is
+    evaluated with the subproduct tree, and the sum is combined bottom-up
+    through the same tree.
+    """
+    points = [a % p for a in points]
+    if len(points) != len(values):
+        raise ValueError("points and values must have the same length")
+    if len(set(points)) != len(points):
+        raise ValueError("interpolation points must be distinct mod p")
+    if not points:
+        return Polynomial.zero(p)
+
+    if len(points) < INTERPOLATE_TREE_THRESHOLD:
+        # Newton's divided differences: f = c_0 + c_1 (X - a_0) + ...
+        # built up one point at a time, the quadratic method.
+        f = Polynomial.zero(p)
+        basis = Polynomial.one(p)
+        for a, y in zip(points, values):
+            basis_at_a = poly_evaluate(basis, a)
+            c = (y - poly_evaluate(f, a)) * pow(basis_at_a, p - 2, p) % p
+            f = f + basis * Polynomial([c], p)
+            basis = basis * Polynomial([-a, 1], p)
+        return f
+
+    tree = subproduct_tree(points, p)
+    weights = _remainders_down(_derivative(tree[-1][0]), tree)
+    level = [Polynomial([y * pow(w, p - 2, p)], p) for y, w in zip(values, weights)]
+    
+    # Combine pairs bottom-up: the node of children L, R gets L * M_R + R * M_L
+    for depth in range(len(tree) - 1):
+        nodes = tree[depth]
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            next_level.append(level[i] * nodes[i + 1] + level[i + 1] * nodes[i])
+        if len(level) % 2 == 1:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
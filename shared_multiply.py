@@ -0,0 +1,164 @@
+##
+# Parallel multiplication of very large polynomials over Z/pZ.
+#
+# The operands are cut into blocks of `block` coefficients, and output block
+# d is the sum of the block products f_i * g_(d-i) (the same scheme as
+# mapped_polynomial.multiply). Every diagonal d is one task on a process
+# pool. The coefficient buffers live in multiprocessing.shared_memory, stored
+# with the fixed width encoding of the mapped files, so the workers read
+# their blocks in place instead of being sent pickled lists, and write their
+# results back the same way. Each block product is a single Decimal product
+# through Kronecker substitution, which libmpdec computes with a
+# number-theoretic transform.
+#
+# Task d produces 2 * block coefficients: the low half goes to block d of the
+# LOW region of the output segment, the high half to block d + 1 of the HIGH
+# region, so no two tasks ever write the same bytes. The product is then
+# LOW + HIGH, summed in one pass by the caller.
+##
+
+import concurrent.futures
+import decimal
+import os
+from multiprocessing import shared_memory
+
+import poly_arithmetic as pa
+import mapped_polynomial as mp
+
+# Blocks are chosen no smaller than this by default; below it the per task
+# overhead dominates.
+MIN_BLOCK = 1 << 10
+
+# Operands of the current multiplication, in a worker (or in the caller when
+# it runs single-process)
+_operands = None
+
+
+class _Operands:
+    """ Views of the shared segments plus the layout of the multiplication. """
+    def __init__(self, a, b, out, p, block, nb_a, nb_b):
+        self.a, self.b, self.out = a, b, out
+        self.p = p
+        self.width = mp.coefficient_width(p)
+        self.block = block
+        self.nb_a, self.nb_b = nb_a, nb_b
+        # Each slot holds a sum of at most block * min(nb_a, nb_b) products < p^2
+        self.digits = len(str((p - 1) ** 2 * block * min(nb_a, nb_b)))
+        # Size of each of the LOW and HIGH regions, in coefficients
+        self.region = (nb_a + nb_b) * block
+
+    def read(self, buf, index):
+        """ Coefficients of block index of buf. """
+        w = self.width * self.block
+        return mp.decode(buf[index * w:(index + 1) * w], self.width)
+
+    def write(self, start, values):
+        """ Stores values at coefficient start of the output segment. """
+        w = self.width
+        self.out[start * w:(start + len(values)) * w] = mp.encode(values, w)
+
+
+def _attach(names, layout):
+    global _operands
+    segments = [shared_memory.SharedMemory(name) for name in names]
+    # Kept referenced so the mappings stay open for the life of the worker
+    _operands = _Operands(*(s.buf for s in segments), *layout)
+    _operands.segments = segments
+
+
+def _diagonal(d):
+    """ Computes output block d into the shared output segment. """
+    ops = _operands
+    acc = decimal.Decimal(0)
+    for i in range(max(0, d - ops.nb_b + 1), min(d, ops.nb_a - 1) + 1):
+        acc = mp.EXACT.add(acc, mp.EXACT.multiply(mp.pack(ops.read(ops.a, i), ops.digits),
+                                                  mp.pack(ops.read(ops.b, d - i), ops.digits)))
+    window = [x % ops.p for x in mp.unpack(acc, ops.digits, 2 * ops.block)]
+    ops.write(d * ops.block, window[:ops.block])
+    ops.write(ops.region + (d + 1) * ops.block, window[ops.block:])
+    return d
+
+
+def block_size(n, workers):
+    """
+    Default block size for operands of n coefficients: the largest power of
+    two up to mapped_polynomial.MULTIPLY_BLOCK that still leaves at least
+    two diagonals per worker (bigger blocks mean fewer, cheaper in total,
+    block products).
+    """
+    block = mp.MULTIPLY_BLOCK
+    while block > MIN_BLOCK and 2 * (-(-n // block)) - 1 < 2 * workers:
+        block //= 2
+    return block
+
+
+def multiply(f, g, workers=None, block=None):
+    """
+    f * g for Polynomials f and g over the same Z/pZ, with the block products
+    spread over `workers` processes (os.cpu_count() by default). With
+    workers=1 the same algorithm runs in the calling process, which is the
+    baseline the scaling report in benchmark.py compares against.
+
+    Args:
+        f, g (Polynomial): the factors
+        workers (int): Optional number of processes
+        block (int): Optional coefficients per block, see block_size
+    Returns:
+        Polynomial: the product
+    """
+    if f.mod != g.mod:
+        raise ValueError("polynomials over different moduli")
+    p = f.mod
+    if f.degree() == -1 or g.degree() == -1:
+        return pa.Polynomial.zero(p)
+    workers = workers or os.cpu_count() or 1
+    block = block or block_size(max(len(f.coefficients), len(g.coefficients)), workers)
+    nb_a = -(-len(f.coefficients) // block)
+    nb_b = -(-len(g.coefficients) // block)
+    width = mp.coefficient_width(p)
+
+    # Segments may be rounded up to a whole number of pages, so every access
+    # below is sliced to the intended length
+    def operand(coefficients, blocks):
+        data = mp.encode(coefficients + [0] * (blocks * block - len(coefficients)), width)
+        segment = shared_memory.SharedMemory(create=True, size=len(data))
+        segment.buf[:len(data)] = data
+        return segment
+
+    global _operands
+    segments = []
+    try:
+        segments.append(operand(f.coefficients, nb_a))
+        segments.append(operand(g.coefficients, nb_b))
+        region = (nb_a + nb_b) * block
+        out_size = 2 * region * width
+        segments.append(shared_memory.SharedMemory(create=True, size=out_size))
+        a, b, out = segments
+        layout = (p, block, nb_a, nb_b)
+        # The high half of the first diagonal and the low half of the block
+        # past the last one are never written
+        out.buf[:out_size] = bytes(out_size)
+        diagonals = range(nb_a + nb_b - 1)
+        if workers == 1:
+            _operands = _Operands(a.buf, b.buf, out.buf, *layout)
+            try:
+                for d in diagonals:
+                    _diagonal(d)
+            finally:
+                _operands = None
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    workers, initializer=_attach,
+                    initargs=([s.name for s in segments], layout)) as pool:
+                # The middle diagonals hold the most block products, so they
+                # are queued first
+                order = sorted(diagonals, key=lambda d: -min(d + 1, nb_a, nb_b, nb_a + nb_b - 1 - d))
+                for _ in pool.map(_diagonal, order):
+                    pass
+        values = mp.decode(out.buf[:out_size], width)
+        length = f.degree() + g.degree() + 1
+        return pa.Polynomial([x + y for x, y in zip(values[:length], values[region:region + length])], p)
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
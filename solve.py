@@ -16,21 +16,56 @@
 
 # Import built-in json library for handling input/output 
 import json
+import contextlib
 import poly_arithmetic as pa
 import finite_field_arithmetic as ffa
+import instrumentation as instr
+import irreducible_catalog as catalog
 
-def solve_exercise(exercise_location : str, answer_location : str):
+def parse_polynomial(data, p):
+    """
+    Builds a polynomial from its JSON form: either the usual dense list of
+    coefficients (ascending), or a sparse {"exponent": coefficient} object for
+    inputs like X^100000 + X + 1. Sparse enough inputs are stored as
+    pa.SparsePolynomial either way (see pa.make_polynomial).
+    """
+    if isinstance(data, dict):
+        return pa.make_polynomial_from_terms({int(e): c for e, c in data.items()}, p)
+    return pa.make_polynomial(data, p)
+
+def solve_exercise(exercise_location : str, answer_location : str, rng=None, stats=False):
     """
     solves an exercise specified in the file located at exercise_location and
     writes the answer to a file at answer_location. Note: the file at
     answer_location might not exist yet and, hence, might still need to be created.
+
+    rng and stats are passed on to solve.
     """
-    
     # Open file at exercise_location for reading.
     with open(exercise_location, "r") as exercise_file:
         # Deserialize JSON exercise data present in exercise_file to corresponding Python exercise data 
         exercise = json.load(exercise_file)
-        
+
+    answer = solve(exercise, rng, stats)
+
+    # Open file at answer_location for writing, creating the file if it does not exist yet
+    # (and overwriting it if it does already exist).
+    with open(answer_location, "w") as answer_file:
+        # Serialize Python answer data (stored in answer) to JSON answer data and write it to answer_file
+        json.dump(answer, answer_file, indent=4)
+
+
+def solve(exercise, rng=None, stats=False):
+    """
+    Solves one exercise given as (JSON-decoded) data and returns the answer
+    dict, without any file I/O; see solver_daemon.py for serving many of them.
+
+    rng (a random.Random instance or an integer seed) is only used by the
+    generation tasks; pass a per-worker stream to make them reproducible.
+    With stats=True the answer gets an extra "stats" block holding the
+    operation counts and timings of this exercise.
+    """
+    rng = pa.resolve_rng(rng)
 
     ### Parse and solve ###
 
@@ -40,116 +75,121 @@ def solve_exercise(exercise_location : str, answer_location : str):
     task = exercise["task"]
     ex_type = exercise["type"]
     # Check type of exercise
-    try:
-        if exercise["type"] == "polynomial_arithmetic":
-            if task in ["addition", "subtraction", "multiplication", "long_division",                "extended_euclidean_algorithm"]:
-                f = pa.Polynomial(exercise["f"], p)
-                g = pa.Polynomial(exercise["g"], p)
-                # Check what task within the polynomial arithmetic tasks we need to perform
-                if exercise["task"] == "addition":
-                    # Solve polynomial arithmetic addition exercise
-                    result = f + g
-                    answer["answer"] = result.coefficients
-                    pass
-                elif exercise["task"] == "subtraction":
-                    # Solve polynomial arithmetic subtraction exercise
-                    result = f - g
-                    answer["answer"] = result.coefficients
-                    pass
-                elif task == "multiplication":
-                    result = f * g
-                    answer["answer"] = result.coefficients
+    # Collect operation counts and timings only when asked for, see instrumentation.py
+    collector = instr.collect() if stats else contextlib.nullcontext()
+    with collector as exercise_stats:
+        try:
+            if exercise["type"] == "polynomial_arithmetic":
+                if task in ["addition", "subtraction", "multiplication", "long_division",                "extended_euclidean_algorithm"]:
+                    f = parse_polynomial(exercise["f"], p)
+                    g = parse_polynomial(exercise["g"], p)
+                    # Check what task within the polynomial arithmetic tasks we need to perform
+                    if exercise["task"] == "addition":
+                        # Solve polynomial arithmetic addition exercise
+                        result = f + g
+                        answer["answer"] = result.coefficients
+                        pass
+                    elif exercise["task"] == "subtraction":
+                        # Solve polynomial arithmetic subtraction exercise
+                        result = f - g
+                        answer["answer"] = result.coefficients
+                        pass
+                    elif task == "multiplication":
+                        result = f * g
+                        answer["answer"] = result.coefficients
                 
-                elif task == "long_division":
-                    q, r = pa.polynomial_LD(f, g)
-                    if q is None:
-                        answer["answer-q"] = None
-                        answer["answer-r"] = None
-                    else:
-                        answer["answer-q"] = q.coefficients
-                        answer["answer-r"] = r.coefficients
+                    elif task == "long_division":
+                        q, r = pa.polynomial_LD(f, g)
+                        if q is None:
+                            answer["answer-q"] = None
+                            answer["answer-r"] = None
+                        else:
+                            answer["answer-q"] = q.coefficients
+                            answer["answer-r"] = r.coefficients
                     
-                elif task == "extended_euclidean_algorithm":
-                    a, b, d = pa.poly_extended_euclidean_algorithm(f, g)
-                    answer["answer-a"] = a.coefficients
-                    answer["answer-b"] = b.coefficients
-                    answer["answer-gcd"] = d.coefficients
+                    elif task == "extended_euclidean_algorithm":
+                        a, b, d = pa.poly_extended_euclidean_algorithm(f, g)
+                        answer["answer-a"] = a.coefficients
+                        answer["answer-b"] = b.coefficients
+                        answer["answer-gcd"] = d.coefficients
                     
-            elif task == "irreducibility_check":
-                    f = pa.Polynomial(exercise["f"], p)
-                    answer["answer"] = pa.poly_irreducibility_check(f)
+                elif task == "irreducibility_check":
+                        f = parse_polynomial(exercise["f"], p)
+                        answer["answer"] = pa.poly_irreducibility_check(f)
                 
-            elif task == "irreducible_element_generation":
-                n = exercise["degree"]
-                poly = pa.poly_generate_irreducible(p, n)
-                answer["answer"] = poly.coefficients
+                elif task == "irreducible_element_generation":
+                    n = exercise["degree"]
+                    # Catalogued (p, n) pairs are instant, otherwise search randomly
+                    poly = catalog.lookup(p, n)
+                    if poly is None:
+                        poly = pa.poly_generate_irreducible(p, n, rng)
+                    answer["answer"] = poly.coefficients
 
-        else: # exercise["type"] == "finite_field_arithmetic"
+            else: # exercise["type"] == "finite_field_arithmetic"
             
-            h = pa.Polynomial(exercise["polynomial_modulus"], p)
+                h = pa.Polynomial(exercise["polynomial_modulus"], p)
+                # Field elements are reduced mod h right away, which keeps sparse
+                # high-degree inputs from ever being expanded to dense lists
             
-            if task in ["addition", "subtraction", "multiplication", "division"]:
-                f = pa.Polynomial(exercise["f"], p)
-                g = pa.Polynomial(exercise["g"], p)
-                # Check what task within the finite field arithmetic tasks we need to perform
-                if exercise["task"] == "addition":
-                    g = pa.Polynomial(exercise["g"], p)
-                    result = f + g
-                    result = ffa.poly_mod_reduction(result, h)
-                    answer["answer"] = result.coefficients
+                if task in ["addition", "subtraction", "multiplication", "division"]:
+                    f = ffa.poly_mod_reduction(parse_polynomial(exercise["f"], p), h)
+                    g = ffa.poly_mod_reduction(parse_polynomial(exercise["g"], p), h)
+                    # Check what task within the finite field arithmetic tasks we need to perform
+                    if exercise["task"] == "addition":
+                        result = f + g
+                        result = ffa.poly_mod_reduction(result, h)
+                        answer["answer"] = result.coefficients
                     
-                elif task == "subtraction":
-                    g = pa.Polynomial(exercise["g"], p)
-                    result = f - g
-                    result = ffa.poly_mod_reduction(result, h)
-                    answer["answer"] = result.coefficients
+                    elif task == "subtraction":
+                        result = f - g
+                        result = ffa.poly_mod_reduction(result, h)
+                        answer["answer"] = result.coefficients
                     
-                elif task == "multiplication":
-                    g = pa.Polynomial(exercise["g"], p)
-                    result = ffa.finite_field_multiply(f, g, h)
-                    answer["answer"] = result.coefficients
+                    elif task == "multiplication":
+                        result = ffa.finite_field_multiply(f, g, h)
+                        answer["answer"] = result.coefficients
                     
-                elif task == "division":
-                    g = pa.Polynomial(exercise["g"], p)
-                    result = ffa.finite_field_division(f, g, h)
-                    if result is None:
+                    elif task == "division":
+                        result = ffa.finite_field_division(f, g, h)
+                        if result is None:
+                            answer["answer"] = None
+                        else:
+                            answer["answer"] = result.coefficients
+                        
+                elif task == "inversion":
+                    f = ffa.poly_mod_reduction(parse_polynomial(exercise["f"], p), h)
+                    f_inv = ffa.finite_field_inversion(f,h) #
+                    if f_inv is None:
                         answer["answer"] = None
                     else:
-                        answer["answer"] = result.coefficients
-                        
-            elif task == "inversion":
-                f = pa.Polynomial(exercise["f"], p)
-                f_inv = ffa.finite_field_inversion(f,h) #
-                if f_inv is None:
-                    answer["answer"] = None
-                else:
-                    answer["answer"] = f_inv.coefficients
-            elif task == "primitivity_check":
-                f = pa.Polynomial(exercise["f"], p)
-                is_prim = ffa.is_primitive(f, h, p)
-                answer["answer"] = is_prim
-            elif task == "primitive_element_generation":
-                n = h.degree()
-                prim_elem = ffa.primitive_generation(h, p)
-                answer["answer"] = prim_elem.coefficients
-            # Solve finite field arithmetic addition exercise
-        # et cetera
-    except Exception as e:
-    # Handle any errors gracefully
-        if "answer-q" in answer or "answer-r" in answer:
-            answer["answer-q"] = None
-            answer["answer-r"] = None
-        elif "answer-a" in answer:
-            answer["answer-a"] = None
-            answer["answer-b"] = None
-            answer["answer-gcd"] = None
-        else:
-            answer["answer"] = None
-    # Open file at answer_location for writing, creating the file if it does not exist yet
-    # (and overwriting it if it does already exist).
-    with open(answer_location, "w") as answer_file:
-        # Serialize Python answer data (stored in answer) to JSON answer data and write it to answer_file
-        json.dump(answer, answer_file, indent=4)
+                        answer["answer"] = f_inv.coefficients
+                elif task == "primitivity_check":
+                    f = ffa.poly_mod_reduction(parse_polynomial(exercise["f"], p), h)
+                    is_prim = ffa.is_primitive(f, h, p)
+                    answer["answer"] = is_prim
+                elif task == "primitive_element_generation":
+                    n = h.degree()
+                    # X is primitive when h is a catalogued primitive polynomial
+                    prim_elem = catalog.known_primitive_element(h)
+                    if prim_elem is None:
+                        prim_elem = ffa.primitive_generation(h, p, rng)
+                    answer["answer"] = prim_elem.coefficients
+                # Solve finite field arithmetic addition exercise
+            # et cetera
+        except Exception as e:
+        # Handle any errors gracefully
+            if "answer-q" in answer or "answer-r" in answer:
+                answer["answer-q"] = None
+                answer["answer-r"] = None
+            elif "answer-a" in answer:
+                answer["answer-a"] = None
+                answer["answer-b"] = None
+                answer["answer-gcd"] = None
+            else:
+                answer["answer"] = None
+    if stats:
+        answer["stats"] = exercise_stats.as_dict()
+    return answer
 
 # You can call your function from here
 # Please do not *run* code outside this block
@@ -0,0 +1,317 @@
+##
+# Long-running solver: serves many exercises from one process, so the
+# interpreter start-up and module imports are paid once, and the state kept
+# by the arithmetic modules (the irreducible catalog index, the cached
+# factorizations of p^n - 1 and the interned zero/one/X per modulus) stays
+# warm across exercises.
+#
+# Usage:
+#   python solver_daemon.py [--socket PATH] [--workers N] [--threads]
+#
+# Without --socket the daemon talks over stdin/stdout. The protocol is one
+# JSON object per line in each direction; responses carry the "id" of their
+# request and may arrive out of order, since requests are solved concurrently:
+#
+#   {"id": 1, "exercise": {...}, "seed": 5, "stats": false}
+#       -> {"id": 1, "answer": {...}}
+#   {"id": 2, "exercise_location": "ex.json", "answer_location": "ans.json"}
+#       -> {"id": 2, "ok": true}
+#   {"id": 3, "command": "stats"}    -> {"id": 3, "stats": {...}}
+#   {"id": 4, "command": "shutdown"} -> {"id": 4, "ok": true}
+#
+# A request that cannot be handled gets {"id": ..., "error": "..."} instead.
+# The asyncio front end only parses and routes; the solving itself runs in a
+# pool of worker processes (or threads with --threads), each of which keeps
+# its own warm caches.
+##
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+
+import solve
+import irreducible_catalog as catalog
+
+# Number of most recent latencies kept per task for the percentiles
+LATENCY_WINDOW = 10000
+
+# Longest request line accepted, in bytes
+MAX_LINE = 1 << 26
+
+
+def _warm_up():
+    """ Worker initializer: loads the catalog before the first request. """
+    catalog._get_index()
+
+
+def _solve_exercise(exercise, seed, stats):
+    return solve.solve(exercise, seed, stats)
+
+
+def _solve_files(exercise_location, answer_location, seed, stats):
+    solve.solve_exercise(exercise_location, answer_location, seed, stats)
+
+
+class LatencyStats:
+    """
+    Request counts and latencies (in seconds) per task, with percentiles over
+    the last LATENCY_WINDOW requests of each task.
+    """
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.started = time.time()
+        self.counts = collections.Counter()
+        self.errors = collections.Counter()
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+
+    def record(self, task, seconds, error=False):
+        self.counts[task] += 1
+        if error:
+            self.errors[task] += 1
+        self.latencies[task].append(seconds)
+
+    @staticmethod
+    def percentiles(samples):
+        """ p50/p90/p99/max/mean of samples in milliseconds (nearest rank). """
+        if not samples:
+            return {}
+        ordered = sorted(samples)
+        def rank(q):
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+        return {
+            "p50": rank(0.50),
+            "p90": rank(0.90),
+            "p99": rank(0.99),
+            "max": ordered[-1] * 1000,
+            "mean": sum(ordered) / len(ordered) * 1000,
+        }
+
+    def as_dict(self):
+        every = [s for samples in self.latencies.values() for s in samples]
+        return {
+            "uptime": time.time() - self.started,
+            "requests": sum(self.counts.values()),
+            "errors": sum(self.errors.values()),
+            "latency_ms": self.percentiles(every),
+            "tasks": {
+                task: {
+                    "requests": self.counts[task],
+                    "errors": self.errors[task],
+                    "latency_ms": self.percentiles(self.latencies[task]),
+                }
+                for task in sorted(self.counts)
+            },
+        }
+
+
+class SolverDaemon:
+    """
+    Routes requests (decoded JSON objects) to a worker pool and keeps the
+    latency statistics.
+
+    Args:
+        executor: concurrent.futures executor to solve in; defaults to a
+                  process pool of `workers` processes
+        workers: pool size when no executor is given (None: os.cpu_count())
+    """
+    def __init__(self, executor=None, workers=None):
+        if executor is None:
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_warm_up)
+        self.executor = executor
+        self.stats = LatencyStats()
+        self.in_flight = 0
+        self.stopped = asyncio.Event()
+
+    async def handle(self, request):
+        """ Handles one request and returns its response. """
+        response = {"id": request.get("id")} if isinstance(request, dict) else {"id": None}
+        try:
+            response.update(await self._dispatch(request))
+        except Exception as e:
+            response["error"] = "%s: %s" % (type(e).__name__, e)
+        return response
+
+    async def _dispatch(self, request):
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+        command = request.get("command", "solve")
+        if command == "stats":
+            stats = self.stats.as_dict()
+            stats["in_flight"] = self.in_flight
+            return {"stats": stats}
+        if command == "shutdown":
+            self.stopped.set()
+            return {"ok": True}
+        if command != "solve":
+            raise ValueError("unknown command %r" % command)
+
+        seed, stats = request.get("seed"), request.get("stats", False)
+        if "exercise" in request:
+            task = request["exercise"].get("task", "unknown")
+            call = (_solve_exercise, request["exercise"], seed, stats)
+        else:
+            task = "file"
+            call = (_solve_files, request["exercise_location"], request["answer_location"],
+                    seed, stats)
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        self.in_flight += 1
+        try:
+            result = await loop.run_in_executor(self.executor, *call)
+        except Exception:
+            self.stats.record(task, time.perf_counter() - start, error=True)
+            raise
+        finally:
+            self.in_flight -= 1
+        self.stats.record(task, time.perf_counter() - start)
+        return {"ok": True} if result is None else {"answer": result}
+
+    async def serve_stream(self, reader, writer):
+        """
+        Reads requests line by line from reader and writes the responses to
+        writer as they complete. Returns at end of input (after answering
+        everything still pending) or on shutdown.
+        """
+        write_lock = asyncio.Lock()
+        pending = set()
+
+        async def respond(line):
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"id": None, "error": "invalid JSON: %s" % e}
+            else:
+                response = await self.handle(request)
+            async with write_lock:
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+
+        stop = asyncio.ensure_future(self.stopped.wait())
+        while True:
+            read = asyncio.ensure_future(reader.readline())
+            await asyncio.wait({read, stop}, return_when=asyncio.FIRST_COMPLETED)
+            if not read.done():
+                read.cancel()
+                break
+            line = read.result()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.ensure_future(respond(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        stop.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class _StdioStream:
+    """
+    Reader/writer pair over stdin/stdout for serve_stream. Lines are read by a
+    daemon thread, so this also works when stdin or stdout is a regular file
+    (for which asyncio has no pipe transports), and a pending read does not
+    keep the process alive after a shutdown request.
+    """
+    def __init__(self):
+        loop = asyncio.get_running_loop()
+        self._lines = asyncio.Queue()
+        self._stdout = sys.stdout.buffer
+
+        def read():
+            # Raw reads from the descriptor: a thread blocked inside
+            # sys.stdin would hold its buffer lock during interpreter exit
+            fd = sys.stdin.fileno()
+            buffered = b""
+            while True:
+                chunk = os.read(fd, 1 << 16)
+                if not chunk:
+                    break
+                *lines, buffered = (buffered + chunk).split(b"\n")
+                for line in lines:
+                    loop.call_soon_threadsafe(self._lines.put_nowait, line + b"\n")
+            if buffered:
+                loop.call_soon_threadsafe(self._lines.put_nowait, buffered)
+            loop.call_soon_threadsafe(self._lines.put_nowait, b"")
+
+        threading.Thread(target=read, daemon=True).start()
+
+    async def readline(self):
+        return await self._lines.get()
+
+    def write(self, data):
+        self._stdout.write(data)
+
+    async def drain(self):
+        self._stdout.flush()
+
+
+async def serve_stdio(daemon):
+    stream = _StdioStream()
+    await daemon.serve_stream(stream, stream)
+
+
+async def serve_socket(daemon, path):
+    clients = set()
+
+    async def client(reader, writer):
+        clients.add(asyncio.current_task())
+        try:
+            await daemon.serve_stream(reader, writer)
+        finally:
+            clients.discard(asyncio.current_task())
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(client, path=path, limit=MAX_LINE)
+    try:
+        async with server:
+            await daemon.stopped.wait()
+        # Let the connections answer what they already accepted
+        if clients:
+            await asyncio.wait(set(clients))
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Long-running exercise solver.")
+    parser.add_argument("--socket", help="listen on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="size of the worker pool (default: number of CPUs)")
+    parser.add_argument("--threads", action="store_true",
+                        help="solve in threads of this process instead of worker processes")
+    args = parser.parse_args(argv)
+
+    async def run():
+        executor = None
+        if args.threads:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=args.workers)
+        daemon = SolverDaemon(executor, args.workers)
+        try:
+            if args.socket:
+                await serve_socket(daemon, args.socket)
+            else:
+                await serve_stdio(daemon)
+        finally:
+            daemon.close()
+
+    asyncio.run(run())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import unittest
 import finite_field_arithmetic as ffa
 import poly_arithmetic as pa
+import instrumentation as instr
 
 class TestFiniteArithmetic(unittest.TestCase):
     def P(self, coeffs, mod=5):
@@ -42,6 +43,17 @@ class TestFiniteArithmetic(unittest.TestCase):
         t = ffa.finite_field_multiply(f, g, self.h())
         self.assertEqual(t.coefficients, [0, 0, 1])
     
+    def test_ff_multiplication_lazy_matches_rowwise(self):
+        import random
+        rng = random.Random(30)
+        for p in [2, 5, 2 ** 61 - 1]:
+            h = pa.Polynomial([rng.randint(0, p - 1) for _ in range(6)] + [1], p)
+            for _ in range(20):
+                f = pa.Polynomial([rng.randint(0, p - 1) for _ in range(9)], p)
+                g = pa.Polynomial([rng.randint(0, p - 1) for _ in range(4)], p)
+                self.assertEqual(ffa.finite_field_multiply(f, g, h).coefficients,
+                                 ffa.finite_field_multiply(f, g, h, lazy=False).coefficients)
+
     def test_ff_inversion(self):
         f = pa.Polynomial([0, 1], 5)
         inv_f = ffa.finite_field_inversion(f, self.h())
@@ -104,7 +116,233 @@ class TestFiniteArithmetic(unittest.TestCase):
         self.assertLess(g.degree(), self.h().degree())
         self.assertTrue(all(0 <= c < 5 for c in g.coefficients))
         self.assertEqual(g.mod, 5)
+
+    def test_ffa_primitive_generation_seeded(self):
+        # Two workers with the same seed draw the same element
+        import random
+        f1 = ffa.primitive_generation(self.h(), 5, random.Random(7))
+        f2 = ffa.primitive_generation(self.h(), 5, random.Random(7))
+        self.assertEqual(f1.coefficients, f2.coefficients)
+        self.assertEqual(ffa.primitive_generation(self.h(), 5, 7).coefficients,
+                         f1.coefficients)
+
+        # The parallel search returns a primitive element as well
+        g = ffa.primitive_generation(self.h(), 5, 7, workers=2)
+        self.assertTrue(ffa.is_primitive(g, self.h(), 5))
+
+    def test_compose_mod_and_frobenius(self):
+        h = self.h()
+        f = pa.Polynomial([1, 2, 0, 4, 3, 1, 0, 2, 1, 1], 5)
+        g = pa.Polynomial([2, 0, 3], 5)
+        
+        # Plain Horner reference for f(g) mod h
+        expected = pa.Polynomial([0], 5)
+        for c in reversed(f.coefficients):
+            expected = ffa.poly_mod_reduction(expected * g + pa.Polynomial([c], 5), h)
+        self.assertEqual(ffa.compose_mod(f, g, h).coefficients, expected.coefficients)
+        self.assertEqual(ffa.compose_mod(pa.Polynomial([0], 5), g, h).coefficients, [0])
+        
+        x = pa.Polynomial([0, 1], 5)
+        for k in range(4):
+            self.assertEqual(ffa.x_frobenius_power(h, k).coefficients,
+                             ffa.power_mod(x, 5 ** k, h).coefficients)
+        self.assertEqual(ffa.frobenius_map(g, h, 2).coefficients,
+                         ffa.power_mod(g, 25, h).coefficients)
+        
+        # Frobenius of order deg(h) is the identity on the field
+        self.assertEqual(ffa.frobenius_map(g, h, 3).coefficients, g.coefficients)
+
+    def test_element_order_and_discrete_log(self):
+        h = self.h()   # GF(125), group order 124 = 2^2 * 31
+        prim = pa.Polynomial([0, 0, 2], 5)
+        self.assertEqual(ffa.element_order(prim, h), 124)
+        self.assertEqual(ffa.element_order(pa.Polynomial([1], 5), h), 1)
+        self.assertEqual(ffa.element_order(pa.Polynomial([4], 5), h), 2)
+        self.assertIsNone(ffa.element_order(pa.Polynomial([0], 5), h))
+        
+        for x in [0, 1, 30, 77, 123]:
+            target = ffa.power_mod(prim, x, h)
+            self.assertEqual(ffa.discrete_log(prim, target, h), x)
+        
+        # 4 = -1 generates {1, 4}, which does not contain X
+        self.assertIsNone(ffa.discrete_log(pa.Polynomial([4], 5), pa.Polynomial([0, 1], 5), h))
+        self.assertEqual(ffa.factorize(124), ((2, 2), (31, 1)))
+
+    def test_field_isomorphism(self):
+        import field_isomorphism as fi
+        h1 = self.h()                             # X^3 + X + 1
+        h2 = pa.Polynomial([1, 0, 1, 1], 5)       # X^3 + X^2 + 1, also irreducible mod 5
+        iso = fi.FieldIsomorphism(h1, h2, rng=35)
+        
+        # The root of h1 really is a root in Z_5[X]/(h2)
+        root = iso.root
+        value = ffa.poly_mod_reduction(root * root * root + root + pa.Polynomial([1], 5), h2)
+        self.assertEqual(value.coefficients, [0])
+        
+        f = pa.Polynomial([3, 2, 1], 5)
+        g = pa.Polynomial([0, 4, 2], 5)
+        self.assertEqual(iso.convert(ffa.finite_field_multiply(f, g, h1)).coefficients,
+                         ffa.finite_field_multiply(iso.convert(f), iso.convert(g), h2).coefficients)
+        self.assertEqual(iso.convert_back(iso.convert(f)).coefficients, f.coefficients)
+        self.assertEqual([c.coefficients for c in iso.convert_many([f, g])],
+                         [iso.convert(f).coefficients, iso.convert(g).coefficients])
+        
+        with self.assertRaises(ValueError):
+            fi.FieldIsomorphism(h1, pa.Polynomial([1, 0, 1], 5))
+
+    def test_normal_basis(self):
+        import normal_basis as nb
+        h = self.h()
+        basis = nb.NormalBasis(h, rng=36)
+        f = pa.Polynomial([3, 2, 1], 5)
+        g = pa.Polynomial([0, 4, 2], 5)
+        u, v = basis.to_normal(f), basis.to_normal(g)
+        
+        self.assertEqual(basis.from_normal(u).coefficients, f.coefficients)
+        self.assertEqual(basis.from_normal(basis.multiply(u, v)).coefficients,
+                         ffa.finite_field_multiply(f, g, h).coefficients)
+        # Frobenius is a shift
+        self.assertEqual(basis.from_normal(basis.frobenius(u)).coefficients,
+                         ffa.power_mod(f, 5, h).coefficients)
+        self.assertEqual(basis.frobenius(u, 3), u)
+        # ... and power_mod can run on the normal basis, with either product
+        for massey_omura in (True, False):
+            basis.massey_omura = massey_omura
+            self.assertEqual(basis.from_normal(basis.multiply(u, v)).coefficients,
+                             ffa.finite_field_multiply(f, g, h).coefficients)
+            self.assertEqual(ffa.power_mod(f, 1234, h, normal_basis=basis).coefficients,
+                             ffa.power_mod(f, 1234, h).coefficients)
+
+        # A dense multiplication matrix falls back to the polynomial basis
+        h = pa.Polynomial([1, 0, 1, 1, 1, 0, 0, 0, 1], 2)
+        basis = nb.NormalBasis(h, rng=36)
+        self.assertEqual(basis.massey_omura, len(basis.terms) <= 2 * 8 - 1)
+        f = pa.Polynomial([1, 1, 0, 1, 0, 0, 1], 2)
+        self.assertEqual(ffa.power_mod(f, 2 ** 40 + 12345, h, normal_basis=basis),
+                         ffa.power_mod(f, 2 ** 40 + 12345, h))
+
+    def test_trace_and_norm(self):
+        h = self.h()
+        f = pa.Polynomial([3, 2, 1], 5)
+        
+        # Reference: the n-term sum and product of the conjugates f^(5^i)
+        conjugates = [ffa.power_mod(f, 5 ** i, h) for i in range(3)]
+        total = ffa.poly_mod_reduction(conjugates[0] + conjugates[1] + conjugates[2], h)
+        product = ffa.finite_field_multiply(
+            ffa.finite_field_multiply(conjugates[0], conjugates[1], h), conjugates[2], h)
+        self.assertEqual(ffa.field_trace(f, h), total.coefficients[0])
+        self.assertEqual(ffa.field_norm(f, h), product.coefficients[0])
+        
+        # Constants: Tr(c) = n * c, N(c) = c^n
+        self.assertEqual(ffa.field_trace(pa.Polynomial([2], 5), h), 1)
+        self.assertEqual(ffa.field_norm(pa.Polynomial([2], 5), h), 3)
+        self.assertEqual(ffa.field_norm(pa.Polynomial([0], 5), h), 0)
+        # X^3 + X + 1 has roots summing to 0 and multiplying to -1
+        self.assertEqual(ffa.field_trace(pa.Polynomial([0, 1], 5), h), 0)
+        self.assertEqual(ffa.field_norm(pa.Polynomial([0, 1], 5), h), 4)
+
+    def test_find_roots(self):
+        # (X - 1)(X - 3)^2 (X^2 + 2), with X^2 + 2 irreducible mod 5
+        f = pa.Polynomial([4, 1], 5) * pa.Polynomial([2, 1], 5) * pa.Polynomial([2, 1], 5) \
+            * pa.Polynomial([2, 0, 1], 5)
+        self.assertEqual(ffa.find_roots(f, rng=39), [1, 3])
+        self.assertEqual(ffa.find_roots(pa.Polynomial([0, 0, 1], 5)), [0])
+        self.assertEqual(ffa.find_roots(self.h()), [])
+        self.assertEqual(ffa.find_roots(pa.Polynomial([1, 1, 1], 2)), [])
+        self.assertEqual(ffa.find_roots(pa.Polynomial([0, 1, 1], 2)), [0, 1])
+        
+        # Large p: never touches all p elements
+        p = 2 ** 61 - 1
+        roots = [12345, 2 ** 40 + 7, p - 1]
+        g = pa.Polynomial([1], p)
+        for r in roots:
+            g = g * pa.Polynomial([-r, 1], p)
+        self.assertEqual(ffa.find_roots(g, rng=39), sorted(roots))
         
+        with self.assertRaises(ValueError):
+            ffa.find_roots(pa.Polynomial([0], 5))
+
+    def test_sparse_mod_reduction(self):
+        # X^(10^12) mod h through the sparse path equals power_mod
+        f = pa.SparsePolynomial({10 ** 12: 1, 1: 2}, 5)
+        expected = ffa.power_mod(pa.Polynomial([0, 1], 5), 10 ** 12, self.h()) + pa.Polynomial([0, 2], 5)
+        self.assertEqual(ffa.poly_mod_reduction(f, self.h()).coefficients,
+                         ffa.poly_mod_reduction(expected, self.h()).coefficients)
+
+    def test_linear_recurrence(self):
+        import random
+        import linear_recurrence as lr
+        # Fibonacci mod 101: X^2 - X - 1
+        fib = [0, 1]
+        for _ in range(60):
+            fib.append((fib[-1] + fib[-2]) % 101)
+        h = lr.berlekamp_massey(fib[:10], 101)
+        self.assertEqual(h.coefficients, [100, 100, 1])
+        self.assertEqual([lr.nth_term([0, 1], h, n) for n in range(62)], fib)
+        # F(10^18) mod 101 via the Pisano period 50
+        self.assertEqual(lr.predict(fib[:4], 10 ** 18, 101), fib[10 ** 18 % 50])
+
+        # LFSR over GF(2) with feedback X^5 + X^2 + 1
+        bits = [1, 0, 0, 1, 1]
+        for _ in range(40):
+            bits.append((bits[-5] + bits[-3]) % 2)
+        self.assertEqual(lr.berlekamp_massey(bits, 2).coefficients, [1, 0, 1, 0, 0, 1])
+
+        # Random recurrence of order 6 mod 7 is recovered from 12 terms
+        rng = random.Random(42)
+        taps = [rng.randrange(1, 7)] + [rng.randrange(7) for _ in range(5)]
+        seq = [rng.randrange(7) for _ in range(6)]
+        for _ in range(30):
+            seq.append(sum(t * s for t, s in zip(taps, seq[-6:])) % 7)
+        h = lr.berlekamp_massey(seq[:12], 7)
+        self.assertLessEqual(h.degree(), 6)
+        self.assertEqual([lr.nth_term(seq, h, n) for n in range(36)], seq)
+
+        # Linear complexity of the zero sequence is 0
+        self.assertEqual(lr.berlekamp_massey([0, 0, 0], 5).coefficients, [1])
+        self.assertEqual(lr.predict([0, 0, 0], 10 ** 9, 5), 0)
+
+    def test_instrumentation_counts(self):
+        f = pa.Polynomial([0, 1], 5)
+        with instr.collect() as stats:
+            ffa.finite_field_inversion(f, self.h())
+        self.assertGreater(stats.counts["constructions"], 0)
+        self.assertGreater(stats.counts["divisions"], 0)
+        self.assertEqual(stats.timings["finite_field_inversion"][0], 1)
+
+        # Timings are per public function, not per sampled candidate
+        with instr.collect() as generation:
+            pa.poly_generate_irreducible(5, 4, 28)
+        self.assertEqual(generation.timings["poly_generate_irreducible"][0], 1)
+        self.assertNotIn("_irreducible_candidate", generation.timings)
+
+        # Nothing is recorded outside a collect() block
+        self.assertFalse(instr.enabled)
+        ffa.finite_field_inversion(f, self.h())
+        self.assertEqual(stats.timings["finite_field_inversion"][0], 1)
+
+    def test_instrumentation_threads(self):
+        import concurrent.futures
+        import solve
+        exercise = {"type": "finite_field_arithmetic", "task": "inversion", "integer_modulus": 5,
+                    "polynomial_modulus": [1, 1, 0, 1], "f": [0, 1]}
+        expected = solve.solve(exercise, None, True)["stats"]["counts"]
+        # Concurrent collect() blocks each count only their own thread's work
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            answers = list(pool.map(lambda _: solve.solve(exercise, None, True), range(200)))
+        for answer in answers:
+            self.assertEqual(answer["stats"]["counts"], expected)
+            self.assertEqual(answer["stats"]["timings"]["finite_field_inversion"]["calls"], 1)
+        self.assertFalse(instr.enabled)
+
+        # A thread outside any block records nothing while another one collects
+        f, h = self.P([0, 1]), self.h()
+        with instr.collect() as stats:
+            with concurrent.futures.ThreadPoolExecutor(1) as pool:
+                pool.submit(ffa.finite_field_inversion, f, h).result()
+        self.assertEqual(stats.counts, {})
+        self.assertEqual(stats.timings, {})
+
 if __name__ == '__main__':
     # Add a note explaining how to run the tests
     print("--- Starting Polynomial Arithmetic Tests ---")
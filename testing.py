@@ -49,6 +49,101 @@ class TestPolynomialArithmetic(unittest.TestCase):
         self.assertEqual(p5.coefficients, [0])
         self.assertEqual(p5.degree(), -1)
 
+    def test_equality_hashing_and_interning(self):
+        import pickle
+        from poly_arithmetic import SparsePolynomial
+        f = self.P([1, 2, 3])
+        self.assertEqual(f, self.P([6, 7, 3, 0]))
+        self.assertNotEqual(f, self.P([1, 2, 3], mod=7))
+        self.assertNotEqual(f, self.P([1, 2]))
+        self.assertEqual(len({f, self.P([1, 2, 3]), self.P([1, 2])}), 2)
+        self.assertEqual({f: "cached"}[self.P([1, 2, 3])], "cached")
+        self.assertEqual(pickle.loads(pickle.dumps(f)), f)
+
+        # Equal dense and sparse polynomials are interchangeable as keys
+        sparse = SparsePolynomial({300: 1, 0: 2}, 5)
+        dense = Polynomial(sparse.coefficients, 5)
+        self.assertEqual(sparse, dense)
+        self.assertEqual(hash(sparse), hash(dense))
+        self.assertEqual(pickle.loads(pickle.dumps(sparse)), sparse)
+        # ... and stay so, since sparse ones are immutable as well
+        with self.assertRaises(TypeError):
+            sparse.terms[0] = 1
+        with self.assertRaises(AttributeError):
+            sparse.terms = {}
+        self.assertEqual(sparse, dense)
+        self.assertEqual(hash(sparse), hash(dense))
+
+        # Attributes cannot be reassigned
+        with self.assertRaises(AttributeError):
+            f.mod = 7
+        with self.assertRaises(AttributeError):
+            f.coefficients = [1]
+
+        # Interned constants
+        self.assertIs(Polynomial.zero(5), Polynomial.zero(5))
+        self.assertIs(Polynomial.x(7), Polynomial.x(7))
+        self.assertEqual(Polynomial.zero(5), self.P([0]))
+        self.assertEqual(Polynomial.one(5), self.P([1]))
+        self.assertEqual(Polynomial.x(5), self.P([0, 1]))
+        self.assertNotEqual(Polynomial.one(5), Polynomial.one(7))
+
+    def test_sparse_matches_dense(self):
+        import random
+        from poly_arithmetic import SparsePolynomial
+        rng = random.Random(40)
+        p = 7
+
+        def sparse(degree, terms):
+            exponents = rng.sample(range(degree), terms - 1) + [degree]
+            return SparsePolynomial({e: rng.randrange(1, p) for e in exponents}, p)
+
+        for _ in range(10):
+            # Sparse operands of both orders, a small dense one, and a zero
+            operands = [sparse(1000, 6), sparse(700, 4), sparse(1000, 3),
+                        Polynomial([rng.randrange(p) for _ in range(5)] + [1], p),
+                        Polynomial([0], p)]
+            for f in operands:
+                for g in operands:
+                    fd, gd = Polynomial(f.coefficients, p), Polynomial(g.coefficients, p)
+                    self.assertEqual((f + g).coefficients, (fd + gd).coefficients)
+                    self.assertEqual((f - g).coefficients, (fd - gd).coefficients)
+                    self.assertEqual((f * g).coefficients, (fd * gd).coefficients)
+                    if g.degree() == -1:
+                        continue
+                    q, r = polynomial_LD(f, g)
+                    qd, rd = polynomial_LD(fd, gd)
+                    self.assertEqual(q.coefficients, qd.coefficients)
+                    self.assertEqual(r.coefficients, rd.coefficients)
+
+    def test_solve_sparse_input(self):
+        import json
+        import os
+        import tempfile
+        from solve import solve_exercise
+        # X^1000 + X + 1 and X^1000 + 3X^999 given as {"exponent": coefficient}
+        exercise = {"type": "polynomial_arithmetic", "task": "subtraction", "integer_modulus": 5,
+                    "f": {"1000": 1, "1": 1, "0": 1}, "g": {"1000": 1, "999": 3}}
+        with tempfile.TemporaryDirectory() as tmp:
+            exercise_path = os.path.join(tmp, "exercise.json")
+            answer_path = os.path.join(tmp, "answer.json")
+            with open(exercise_path, "w") as f:
+                json.dump(exercise, f)
+            solve_exercise(exercise_path, answer_path)
+            with open(answer_path) as f:
+                answer = json.load(f)
+        expected = [1, 1] + [0] * 997 + [2]
+        self.assertEqual(answer["answer"], expected)
+
+        # Negative exponents are malformed input, not X^(-1) wrapped around
+        from poly_arithmetic import SparsePolynomial
+        from solve import solve
+        with self.assertRaises(ValueError):
+            SparsePolynomial({-1: 1, 2: 1}, 5)
+        exercise = {"type": "polynomial_arithmetic", "task": "addition", "integer_modulus": 5,
+                    "f": {"-1": 1, "2": 1}, "g": [0]}
+        self.assertIsNone(solve(exercise)["answer"])
+
     # --- Test Cases for Basic Arithmetic Operations (+, -, *) ---
 
     def test_addition(self):
@@ -219,6 +314,41 @@ class TestPolynomialArithmetic(unittest.TestCase):
         lhs = a * f + b * g
         self.assertEqual(lhs.coefficients, d.coefficients, "Bézout's identity failed: a*f + b*g != d")
 
+    def test_poly_gcd_and_half_eea(self):
+        import random
+        from poly_arithmetic import poly_gcd, poly_half_extended_euclidean
+        rng = random.Random(38)
+        common = Polynomial([3, 0, 1], 7) # X^2 + 3
+        cases = [
+            (Polynomial([4, 3, 2, 1], 5), Polynomial([3, 0, 1], 5)),       # coprime
+            (self.P([1, 2, 3]), self.P([0])),                              # zero operands
+            (self.P([0]), self.P([2, 4])),
+            (self.P([0]), self.P([0])),
+            (Polynomial([1, 1, 2], 3), Polynomial([1, 2], 3)),             # non-monic
+            (common * Polynomial([1, 5, 3], 7), common * Polynomial([6, 2], 7)), # common factor
+        ]
+        for _ in range(20):
+            f = Polynomial([rng.randrange(7) for _ in range(rng.randint(1, 12))], 7)
+            g = Polynomial([rng.randrange(7) for _ in range(rng.randint(1, 12))], 7)
+            cases.append((f * common, g))
+        for f, g in cases:
+            a, _b, d = poly_extended_euclidean_algorithm(f, g)
+            self.assertEqual(poly_gcd(f, g), d)
+            self.assertEqual(poly_half_extended_euclidean(f, g), (a, d))
+        # The shared factor is found
+        self.assertEqual(poly_gcd(*cases[5]), common)
+
+    def test_poly_is_squarefree(self):
+        from poly_arithmetic import poly_is_squarefree
+        p = 5
+        self.assertTrue(poly_is_squarefree(self.P([3])))
+        self.assertTrue(poly_is_squarefree(self.P([1, 0, 1])))     # (X + 2)(X + 3)
+        self.assertTrue(poly_is_squarefree(self.P([0, 1]) * self.P([1, 1]) * self.P([2, 0, 1])))
+        self.assertFalse(poly_is_squarefree(self.P([1, 1]) * self.P([1, 1]) * self.P([2, 0, 1])))
+        self.assertFalse(poly_is_squarefree(self.P([3, 0, 1]) * self.P([3, 0, 1])))
+        # A p-th power has derivative 0: X^5 + 1 = (X + 1)^5 in characteristic 5
+        self.assertFalse(poly_is_squarefree(Polynomial([1, 0, 0, 0, 0, 1], p)))
+        self.assertFalse(poly_is_squarefree(Polynomial([1, 0, 1], 2)))  # (X + 1)^2
 
     # --- Test Cases for Irreducibility Check and Generation ---
 
@@ -265,6 +395,158 @@ class TestPolynomialArithmetic(unittest.TestCase):
         self.assertTrue(poly_irreducibility_check(f))
         self.assertEqual(f.coefficients[-1], 1, "Generated polynomial must be monic")
 
+    def test_poly_generate_irreducible_seeded(self):
+        # Same seed -> same stream -> same polynomial
+        import random
+        f1 = poly_generate_irreducible(3, 4, random.Random(2024))
+        f2 = poly_generate_irreducible(3, 4, random.Random(2024))
+        self.assertEqual(f1.coefficients, f2.coefficients)
+
+        # An integer seed behaves like a fresh random.Random(seed)
+        f3 = poly_generate_irreducible(3, 4, 2024)
+        self.assertEqual(f3.coefficients, f1.coefficients)
+        self.assertTrue(poly_irreducibility_check(f3))
+
+    def test_poly_generate_irreducible_parallel(self):
+        f = poly_generate_irreducible(7, 4, rng=11, workers=2)
+        self.assertEqual(f.degree(), 4)
+        self.assertEqual(f.coefficients[-1], 1)
+        self.assertTrue(poly_irreducibility_check(f))
+
+    def test_irreducible_catalog(self):
+        import irreducible_catalog as catalog
+        # Conway polynomials from the catalog, e.g. C_{2,8} = X^8 + X^4 + X^3 + X^2 + 1
+        self.assertEqual(catalog.lookup(2, 8, "conway").coefficients,
+                         [1, 0, 1, 1, 1, 0, 0, 0, 1])
+        self.assertEqual(catalog.lookup(3, 2).coefficients, [2, 2, 1])
+        for kind in catalog.KINDS:
+            f = catalog.lookup(5, 3, kind)
+            self.assertEqual(f.degree(), 3)
+            self.assertTrue(poly_irreducibility_check(f))
+
+        # Missing pairs fall through to the random search
+        self.assertIsNone(catalog.lookup(2, 1000))
+
+        # X is returned reduced, which matters for degree 1: X = 3 mod X + 4
+        h = catalog.lookup(7, 1, "conway")
+        self.assertEqual(h.coefficients, [4, 1])
+        self.assertEqual(catalog.known_primitive_element(h).coefficients, [3])
+        self.assertEqual(catalog.known_primitive_element(catalog.lookup(2, 8, "conway")).coefficients, [0, 1])
+        self.assertIsNone(catalog.known_primitive_element(Polynomial([1, 1, 1], 2) * Polynomial([1, 1], 2)))
+        from solve import solve
+        answer = solve({"type": "finite_field_arithmetic", "task": "primitive_element_generation",
+                        "integer_modulus": 7, "polynomial_modulus": [4, 1]})
+        self.assertEqual(answer["answer"], [3])
+
+        # Lines round-trip through the sparse format
+        f = Polynomial([1, 0, 0, 0, 1, 1], 2)
+        line = catalog.format_line(2, "lowweight", f)
+        self.assertEqual(line, "2 5 lowweight 0:1 4:1 5:1")
+        self.assertEqual(catalog.parse_line(line), (2, 5, "lowweight", f.coefficients))
+
+    def test_evaluate_many_and_interpolate(self):
+        import random
+        import poly_arithmetic as pa
+        rng = random.Random(32)
+        p = 101
+        f = Polynomial([rng.randrange(p) for _ in range(80)], p)
+        points = rng.sample(range(p), 80)
+        self.assertEqual(pa.poly_evaluate(Polynomial([1, 2, 3], 5), 2), 2) # 1 + 4 + 12
+
+        # Direct methods and subproduct tree agree, and interpolation inverts evaluation
+        values = pa.evaluate_many(f, points)
+        self.assertEqual(values, [pa.poly_evaluate(f, a) for a in points])
+        self.assertEqual(pa._remainders_down(f, pa.subproduct_tree(points, p)), values)
+        self.assertEqual(pa.interpolate(points, values, p).coefficients, f.coefficients)
+        self.assertLess(pa.interpolate(points[:10], values[:10], p).degree(), 10)
+
+        with self.assertRaises(ValueError):
+            pa.interpolate([1, 102], [0, 0], p)
+
+    def test_barrett_and_montgomery_reduction(self):
+        import random
+        import modular
+        rng = random.Random(31)
+        for p in [5, 2 ** 61 - 1, 2 ** 64 - 59, 2 ** 127 - 1]:
+            barrett = modular.get_barrett(p)
+            mont = modular.get_montgomery(p)
+            for _ in range(200):
+                a, b = rng.randrange(p), rng.randrange(p)
+                self.assertEqual(barrett.mul(a, b), a * b % p)
+                prod = mont.mul(mont.to_mont(a), mont.to_mont(b))
+                self.assertEqual(mont.from_mont(prod), a * b % p)
+            self.assertEqual(mont.from_mont(mont.pow(mont.to_mont(3), 10 ** 6)),
+                             pow(3, 10 ** 6, p))
+
+    def test_mapped_polynomial(self):
+        import os
+        import random
+        import tempfile
+        import finite_field_arithmetic as ffa
+        import mapped_polynomial as mp
+        rng = random.Random(43)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = lambda name: os.path.join(tmp, name)
+            for p in [2, 101, 2 ** 127 - 1]:
+                f = Polynomial([rng.randrange(p) for _ in range(300)], p)
+                g = Polynomial([rng.randrange(p) for _ in range(211)] + [1], p)
+                h = Polynomial([rng.randrange(p) for _ in range(4)] + [1], p)
+                with mp.MappedPolynomial.from_polynomial(f, path("f")) as F, \
+                        mp.MappedPolynomial.from_polynomial(g, path("g")) as G:
+                    with mp.MappedPolynomial(path("f")) as reopened:
+                        self.assertEqual(reopened.mod, p)
+                        self.assertEqual(reopened.to_polynomial().coefficients, f.coefficients)
+                    # Small blocks so that every operation crosses block boundaries
+                    with mp.add(F, G, path("s"), block=64) as S:
+                        self.assertEqual(S.to_polynomial().coefficients, (f + g).coefficients)
+                    with mp.sub(G, F, path("d"), block=64) as D:
+                        self.assertEqual(D.to_polynomial().coefficients, (g - f).coefficients)
+                    with mp.sub(F, F, path("z"), block=64) as Z:
+                        self.assertEqual(Z.degree(), -1)
+                    with mp.multiply(F, G, path("m"), block=64) as M:
+                        self.assertEqual(M.to_polynomial().coefficients, (f * g).coefficients)
+                    self.assertEqual(mp.mod_reduction(F, h, block=64).coefficients,
+                                     ffa.poly_mod_reduction(f, h).coefficients)
+
+    def test_shared_multiply(self):
+        import random
+        import shared_multiply
+        rng = random.Random(46)
+        for p in [2, 101, 2 ** 127 - 1]:
+            f = Polynomial([rng.randrange(p) for _ in range(300)] + [1], p)
+            g = Polynomial([rng.randrange(p) for _ in range(211)] + [1], p)
+            # Small blocks so that there are many diagonals to spread
+            for workers in [1, 2]:
+                self.assertEqual(shared_multiply.multiply(f, g, workers, block=32), f * g)
+            self.assertEqual(shared_multiply.multiply(f, Polynomial.zero(p), 2), Polynomial.zero(p))
+
+    def test_solver_daemon(self):
+        import asyncio
+        import concurrent.futures
+        import solver_daemon
+
+        async def session():
+            daemon = solver_daemon.SolverDaemon(concurrent.futures.ThreadPoolExecutor(2))
+            try:
+                exercise = {"type": "polynomial_arithmetic", "task": "multiplication",
+                            "integer_modulus": 7, "f": [1, 2], "g": [3, 4]}
+                solved = await asyncio.gather(*[
+                    daemon.handle({"id": i, "exercise": exercise}) for i in range(5)])
+                bad = await daemon.handle({"id": "bad", "exercise": {}})
+                stats = await daemon.handle({"id": "s", "command": "stats"})
+            finally:
+                daemon.close()
+            return solved, bad, stats
+
+        solved, bad, stats = asyncio.run(session())
+        self.assertEqual([r["id"] for r in solved], list(range(5)))
+        self.assertTrue(all(r["answer"] == {"answer": [3, 3, 1]} for r in solved))
+        self.assertIn("error", bad)
+        self.assertEqual(stats["stats"]["requests"], 6)
+        self.assertEqual(stats["stats"]["errors"], 1)
+        self.assertEqual(stats["stats"]["tasks"]["multiplication"]["requests"], 5)
+        self.assertIn("p99", stats["stats"]["latency_ms"])
+
 
 if __name__ == '__main__':
     # Add a note explaining how to run the tests